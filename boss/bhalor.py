@@ -7,6 +7,7 @@ import numpy as np
 from boss.boss import Boss
 from controller import Controller
 from db import FA_BHALOR
+from frames import FrameBundle
 from model import Direction
 from sensor import FaSensor
 
@@ -65,12 +66,14 @@ class BossBhalor(Boss):
     #  - Вокруг найденной метки взять ROI и убедиться, что в нём преобладают вертикальные грани (Sobel по x/y или HoughLinesP).
     #  - Оценить расстояние от центра персонажа (обычно центр кадра) до метки и вернуть true, если оно меньше порога.
     # Код даёт True/False и, при желании, рисует отладочную картинку.
-    def find_purple_marker(self, hsv):
+    def color_ranges(self) -> dict:
         # Диапазоны для пурпурного/фиолетового (можно подстроить под вашу игру)
-        lower1 = np.array([129, 220, 100])  # H,S,V
-        upper1 = np.array([137, 235, 150])
+        return super().color_ranges() | {
+            "marker": [((129, 220, 100), (137, 235, 150))]  # H,S,V
+        }
 
-        mask = cv2.inRange(hsv, lower1, upper1)
+    def find_purple_marker(self, frame: FrameBundle):
+        mask = self.colors.frame_mask(frame, "marker")
         ## remove noise
         # mask = cv.morphologyEx(mask, cv.MORPH_OPEN, np.ones((3, 3), np.uint8), iterations=2)
         # mask = cv.morphologyEx(
@@ -97,10 +100,10 @@ class BossBhalor(Boss):
         center = (int(cx), int(cy))
         return (center, box), mask
 
-    def is_near_exit(self, hsv, bgr=None) -> tuple[bool, Direction | None]:
-        H, W = hsv.shape[:2]
+    def is_near_exit(self, frame: FrameBundle) -> tuple[bool, Direction | None]:
+        H, W = frame.game.shape[:2]
         # 1) находим фиолетовую метку
-        hit, mask = self.find_purple_marker(hsv)
+        hit, mask = self.find_purple_marker(frame)
         if hit is None:
             return False, None
 
@@ -130,7 +133,7 @@ class BossBhalor(Boss):
             return verdict, dir
 
         # Отрисовка для отладки
-        dbg = hsv.copy()
+        dbg = frame.hsv.copy()
         cv2.circle(dbg, (mx, my), 8, (255, 0, 255), 2)
         cv2.circle(dbg, (px, py), 6, (0, 255, 0), -1)
         # Direction.SW
@@ -6,21 +6,20 @@ from math import hypot
 import cv2
 import numpy as np
 
+from color_classes import ColorClasses, color_classes
 from controller import Controller
 from detect_location import find_tpl, wait_for
+from frames import FrameBundle, crop
 from model import Direction
 from sensor import Sensor
+from templates import TEMPLATES
 
 logger = logging.getLogger(__name__)
-hp_bar_tpl = cv2.imread("resources/hp_bar.png")
+hp_bar_tpl = TEMPLATES["hp_bar"]
 
 
 def extract_boss_health(frame: cv2.typing.MatLike) -> cv2.typing.MatLike:
-    X = 398
-    Y = 133
-    W = 480
-    H = 10
-    return cv2.resize(frame[Y : Y + H, X : X + W], (W, H))
+    return crop(frame, "boss_health")
 
 
 def measure_fill_px(roi: cv2.typing.MatLike, debug=False) -> float:
@@ -30,7 +29,8 @@ def measure_fill_px(roi: cv2.typing.MatLike, debug=False) -> float:
     if box is None:
         return 0
 
-    roi = cv2.resize(roi[0 : 0 + H, 10 : 10 + 460], (460, H))
+    roi = roi[0 : 0 + H, 10 : 10 + 460]
+    roi = roi.copy() if debug else roi  # debug draws on it
     H, W = roi.shape[:2]
     hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
     mask = cv2.inRange(hsv, (170, 150, 100), (180, 255, 210))
@@ -63,6 +63,12 @@ def measure_fill_px(roi: cv2.typing.MatLike, debug=False) -> float:
 
 class Boss(ABC):
     sensor: Sensor | None = None
+    # насыщенный яркий красный полоски HP врагов (две «красные» дуги оттенков)
+    ENEMY_RANGES = [
+        ((0, 120, 120), (10, 255, 255)),
+        ((170, 120, 120), (180, 255, 255)),
+    ]
+    _colors: ColorClasses | None = None
     minimap_masks = None
     fa_dir_threshold = {
         "ne": 18,
@@ -90,6 +96,10 @@ class Boss(ABC):
         self.exit_tpl_sw_threshold = 0.74
         self.exit_tpl_ne = None
         self.exit_tpl_ne_threshold = 0.67
+        # ensure_movement: сначала сдвиг сцены (motion.py), dHash - когда он
+        # шаг не подтвердил. Выключено, пока не проверено на записанных кадрах
+        # (bot_utils/verify_motion.py)
+        self.motion_check = False
 
     @abstractmethod
     def start_fight(self, dir: Direction) -> int:
@@ -106,54 +116,54 @@ class Boss(ABC):
     def open_chest(self, dir: Direction) -> bool:
         # open chest
         self.controller.move_W() if dir == Direction.SW else self.controller.move_N()
-        time.sleep(0.5)
+        self.controller.settle(0.5)
         self.controller.skill_4()
         time.sleep(2.8)
         self.controller.move_W() if dir == Direction.SW else self.controller.move_N()
-        time.sleep(0.5)
+        self.controller.settle(0.5)
         self.controller.move_SW() if dir == Direction.SW else self.controller.move_NE()
         return True
 
-    def is_near_exit(
-        self, hsv: cv2.typing.MatLike, bgr: cv2.typing.MatLike
-    ) -> tuple[bool, Direction | None]:
+    def color_ranges(self) -> dict:
+        """Цветовые классы кадра (frame.hsv) для ColorClasses."""
+        ranges = {"enemy": self.ENEMY_RANGES}
+        if hasattr(self, "SW_GATE_LOW1"):
+            ranges["exit"] = [
+                (self.SW_GATE_LOW1, self.SW_GATE_UPP1),
+                (self.SW_GATE_LOW2, self.SW_GATE_UPP2),
+                (self.SW_GATE_LOW3, self.SW_GATE_UPP3),
+                (self.NE_GATE_LOW1, self.NE_GATE_UPP1),
+                (self.NE_GATE_LOW2, self.NE_GATE_UPP2),
+            ]
+        return ranges
+
+    @property
+    def colors(self) -> ColorClasses:
+        """Все цветовые маски кадра за один проход по нему."""
+        if self._colors is None:
+            self._colors = color_classes(self.color_ranges())
+        return self._colors
+
+    def is_near_exit(self, frame: FrameBundle) -> tuple[bool, Direction | None]:
         if self.exit_check_type == "mask":
-            return self.is_near_exit_mask(hsv)
+            return self.is_near_exit_mask(frame)
         if self.exit_check_type == "tpl":
-            return self.is_near_exit_tpl(bgr)
+            return self.is_near_exit_tpl(frame)
 
-        near, dir = self.is_near_exit_mask(hsv)
+        near, dir = self.is_near_exit_mask(frame)
         if near:
             return near, dir
 
-        return self.is_near_exit_tpl(bgr)
+        return self.is_near_exit_tpl(frame)
 
-    def is_near_exit_mask(
-        self, hsv: cv2.typing.MatLike
-    ) -> tuple[bool, Direction | None]:
+    def is_near_exit_mask(self, frame: FrameBundle) -> tuple[bool, Direction | None]:
         """
         https://pseudopencv2.site/utilities/hsvcolormask/
         """
-        H, W = hsv.shape[:2]
+        H, W = frame.game.shape[:2]
         px, py = W // 2, H // 2
-        sw1 = cv2.inRange(hsv, self.SW_GATE_LOW1, self.SW_GATE_UPP1)
-        sw2 = cv2.inRange(hsv, self.SW_GATE_LOW2, self.SW_GATE_UPP2)
-        sw3 = cv2.inRange(hsv, self.SW_GATE_LOW3, self.SW_GATE_UPP3)
-        # sw3 = cv2.morphologyEx(sw3, cv2.MORPH_OPEN, np.ones((3, 3), np.uint8), iterations=1)
-        # cv2.imshow("DBG/sw1", sw1)
-        # cv2.imshow("DBG/sw2", sw2)
-        # cv2.imshow("DBG/sw3", sw3)
-
-        ne1 = cv2.inRange(hsv, self.NE_GATE_LOW1, self.NE_GATE_UPP1)
-        ne2 = cv2.inRange(hsv, self.NE_GATE_LOW2, self.NE_GATE_UPP2)
-
-        # cv2.imshow("DBG/ne1ne2", cv2.bitwise_or(ne1, ne2))
-        # cv2.imshow("DBG/sw", cv2.bitwise_or(sw1, cv2.bitwise_or(sw2, sw3)))
-
-        m = cv2.bitwise_or(
-            cv2.bitwise_or(sw1, cv2.bitwise_or(sw2, sw3)),
-            cv2.bitwise_or(ne1, ne2),
-        )
+        # ворота SW (3 диапазона) и NE (2) одной маской
+        m = self.colors.frame_mask(frame, "exit")
         m = cv2.morphologyEx(
             m, cv2.MORPH_CLOSE, np.ones((5, 5), np.uint8), iterations=2
         )
@@ -190,7 +200,7 @@ class Boss(ABC):
                 if cx and cy:
                     self.exit_dbg_area.append((cx, cy))
 
-                dbg = hsv.copy()
+                dbg = frame.hsv.copy()
                 for x, y in self.exit_dbg_area:
                     cv2.circle(dbg, (x, y), 6, (0, 0, 255), -1)
                 cv2.imshow("exit/DBG", dbg)
@@ -198,16 +208,13 @@ class Boss(ABC):
 
         return verdict, None
 
-    def is_near_exit_tpl(
-        self, bgr: cv2.typing.MatLike
-    ) -> tuple[bool, Direction | None]:
+    def is_near_exit_tpl(self, frame: FrameBundle) -> tuple[bool, Direction | None]:
         if self.exit_tpl_sw is None or self.exit_tpl_ne is None:
             raise ValueError("Exit templates not set")
 
         X, Y, X2, Y2 = self.exit_sw_tpl_roi
-        frame = cv2.resize(bgr[Y:Y2, X:X2], (X2 - X, Y2 - Y))
         box, score = find_tpl(
-            frame,
+            frame.gray[Y:Y2, X:X2],
             self.exit_tpl_sw,
             [1.0],
             score_threshold=self.exit_tpl_sw_threshold,
@@ -216,9 +223,8 @@ class Boss(ABC):
             return True, Direction.SW
 
         X, Y, X2, Y2 = self.exit_ne_tpl_roi
-        frame = cv2.resize(bgr[Y:Y2, X:X2], (X2 - X, Y2 - Y))
         box, score = find_tpl(
-            frame,
+            frame.gray[Y:Y2, X:X2],
             self.exit_tpl_ne,
             [1.0],
             score_threshold=self.exit_tpl_ne_threshold,
@@ -228,15 +234,9 @@ class Boss(ABC):
 
         return False, None
 
-    def count_enemies(self, frame830x690: cv2.typing.MatLike) -> int:
-        hsv = cv2.cvtColor(frame830x690, cv2.COLOR_BGR2HSV)
+    def count_enemies(self, frame: FrameBundle) -> int:
         # 2) Красная маска в HSV (две «красные» дуги на круге оттенков)
-        # насыщенный яркий красный
-        lower1 = np.array([0, 120, 120])
-        upper1 = np.array([10, 255, 255])
-        lower2 = np.array([170, 120, 120])
-        upper2 = np.array([180, 255, 255])
-        mask = cv2.inRange(hsv, lower1, upper1) | cv2.inRange(hsv, lower2, upper2)
+        mask = self.colors.frame_mask(frame, "enemy")
 
         # 4) Находим контуры и фильтруем по «узкая горизонтальная плашка»
         cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -299,8 +299,8 @@ class Boss(ABC):
 
         return len(candidates)
 
-    def _get_frame(self) -> cv2.typing.MatLike:
-        return self.controller.device.get_frame2()
+    def _get_frame(self, scale: int = 1) -> cv2.typing.MatLike:
+        return self.controller.get_frame(scale)
 
     def tavern_Route(self) -> bool:
         self.controller.press(315, 500, 1500)  # E
@@ -312,7 +312,7 @@ class Boss(ABC):
     def back(self) -> None:
         # raise 'back'  # debug
         self.controller.back()
-        time.sleep(0.2)
+        time.sleep(self.controller.back_delay)
         self.controller._tap((740, 500))  # select yes
         self.controller.wait_loading(1)
         time.sleep(2)
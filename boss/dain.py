@@ -1,16 +1,15 @@
 import logging
 import time
 
-
-import cv2
-
 from boss.boss import Boss, extract_boss_health, measure_fill_px
 from bot_utils.screenshoter import save_image
 from controller import Controller
 from db import FA_BHALOR
 from detect_location import wait_for
+from frames import FrameBundle
 from model import Direction
 from sensor import FaSensor, MinimapSensor
+from templates import TEMPLATES
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +30,8 @@ class BossDain(Boss):
         self.no_combat_minions = True
         self.exit_check_type = "tpl"  # 'mask' | 'tpl'
         self.exit_tpl_sw_threshold = 0.57
-        self.exit_tpl_sw = cv2.imread("resources/dain/sw.png")
-        self.exit_tpl_ne = cv2.imread("resources/dain/ne.png")
+        self.exit_tpl_sw = TEMPLATES["dain/sw"]
+        self.exit_tpl_ne = TEMPLATES["dain/ne"]
         self.fa_dir_threshold = {
             "ne": 30,
             "nw": 30,
@@ -82,10 +81,10 @@ class BossDain(Boss):
         )
         self.ensure_movement = True
         self.controller.move_E()
-        time.sleep(0.2)
+        self.controller.settle(0.2)
         self.controller.move_SE()
 
-    def count_enemies(self, frame830x690: cv2.typing.MatLike) -> int:
+    def count_enemies(self, frame: FrameBundle) -> int:
         return 0
 
     def start_fight(self, dir: Direction) -> int:
@@ -150,7 +149,7 @@ class BossDain(Boss):
     def open_chest(self, dir: Direction) -> bool:
         if dir == Direction.NE:
             self.controller.move_NE()
-            time.sleep(0.2)
+            self.controller.settle(0.2)
 
         self.controller.skill_4((590, 390) if dir == Direction.SW else None)
         t0 = time.time()
@@ -167,9 +166,9 @@ class BossDain(Boss):
 
         logger.debug(f"Chest opened in {time.time() - t0:.1f}s")
         self.controller.move_S() if dir == Direction.SW else self.controller.move_E()
-        time.sleep(0.1)
+        self.controller.settle(0.1)
         self.controller.move_SW() if dir == Direction.SW else self.controller.move_NE()
-        time.sleep(0.5)
+        self.controller.settle(0.5)
         return True
 
     def portal(self) -> None:
@@ -1,12 +1,11 @@
 import time
 
-import cv2
-
 from boss.boss import Boss
 from bot_utils.screenshoter import save_image
 from controller import Controller
 from model import Direction
 from sensor import MinimapSensor
+from templates import TEMPLATES
 
 
 class BossDelingh(Boss):
@@ -19,8 +18,8 @@ class BossDelingh(Boss):
         self.ensure_movement = True
 
         self.exit_check_type = "tpl"  # 'mask' | 'tpl'
-        self.exit_tpl_sw = cv2.imread("resources/delingh/exit_sw.png")
-        self.exit_tpl_ne = cv2.imread("resources/delingh/exit_ne.png")
+        self.exit_tpl_sw = TEMPLATES["delingh/exit_sw"]
+        self.exit_tpl_ne = TEMPLATES["delingh/exit_ne"]
         self.exit_tpl_ne_threshold = 0.8
         self.exit_tpl_sw_threshold = 0.7
 
@@ -73,11 +72,11 @@ class BossDelingh(Boss):
 
     def open_chest(self, dir: Direction) -> bool:
         None if dir == Direction.SW else self.controller.move_NE()
-        time.sleep(0.2) if dir == Direction.NE else None
+        self.controller.settle(0.2) if dir == Direction.NE else None
         self.controller.skill_4()
         time.sleep(2.7)
         self.controller.move_S() if dir == Direction.SW else self.controller.move_E()
-        time.sleep(0.5)
+        self.controller.settle(0.5)
         return True
 
     def portal(self) -> None:
@@ -87,7 +86,7 @@ class BossDelingh(Boss):
     def fix_disaster(self):
         return
         self.controller.move_SE()
-        time.sleep(0.2)
+        self.controller.settle(0.2)
 
     def fix_blockage(self):
         # save_image(
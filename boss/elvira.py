@@ -1,13 +1,12 @@
 import time
 
-import cv2
-
 from boss.boss import Boss
 from controller import Controller
 from db import FA_BHALOR
 from detect_location import find_tpl
 from model import Direction
 from sensor import FaSensor, MinimapSensor
+from templates import TEMPLATES
 
 
 class BossElvira(Boss):
@@ -22,8 +21,8 @@ class BossElvira(Boss):
         self.exit_check_type = "tpl"  # 'mask' | 'tpl'
         self.exit_tpl_sw_threshold = 0.70
         self.exit_tpl_ne_threshold = 0.78
-        self.exit_tpl_sw = cv2.imread("resources/elvira/sw.png")
-        self.exit_tpl_ne = cv2.imread("resources/elvira/ne.png")
+        self.exit_tpl_sw = TEMPLATES["elvira/sw"]
+        self.exit_tpl_ne = TEMPLATES["elvira/ne"]
 
     def init_camera(self) -> None:
         # self.sensor = MinimapSensor(
@@ -47,7 +46,7 @@ class BossElvira(Boss):
     def start_fight(self, dir: Direction) -> int:
         if dir == Direction.NE:
             self.controller.move_NE()
-            time.sleep(0.4)
+            self.controller.settle(0.4)
 
         self.controller.skill_3(
             (540, 360) if dir == Direction.SW else (640, 290)
@@ -81,7 +80,7 @@ class BossElvira(Boss):
         self.controller.skill_4()
         time.sleep(2.7)
         self.controller.move_S() if dir == Direction.SW else self.controller.move_E()
-        time.sleep(0.5)
+        self.controller.settle(0.5)
         return True
 
     def portal(self) -> None:
@@ -90,15 +89,19 @@ class BossElvira(Boss):
 
     def fix_disaster(self):
         time.sleep(0.7)  # wait for any animation to finish
-        exit_ban = cv2.imread("resources/elvira_exit_ban.png", cv2.IMREAD_COLOR)
+        exit_ban = TEMPLATES["elvira_exit_ban"]
         exit_ban_box, _ = find_tpl(
-            self._get_frame(), exit_ban, score_threshold=0.9, debug=self.debug
+            self._get_frame(),
+            exit_ban,
+            score_threshold=0.9,
+            debug=self.debug,
+            pyramid=2,
         )
         if exit_ban_box is not None:
             self.controller.back()  # close banner
-            time.sleep(0.2)
+            time.sleep(self.controller.back_delay)
             self.controller.move_SE()
-            time.sleep(0.15)
+            self.controller.settle(0.15)
             return
 
         time.sleep(1.5)  # wait for any animation to finish
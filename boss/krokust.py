@@ -2,11 +2,12 @@ import logging
 from math import hypot
 import time
 
-import cv2
 from boss.dain import BossDain
 from controller import Controller
-from detect_location import find_tpl
+from detect_location import find_tpl, match_many
+from frames import FrameBundle, FrameGate
 from model import Direction
+from templates import TEMPLATES
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +23,14 @@ class BossKrokust(BossDain):
         }
         self.exit_tpl_sw_threshold = 0.83
         self.exit_tpl_ne_threshold = 0.83
-        self.exit_tpl_sw = cv2.imread("resources/krokust/sw.png")
-        self.exit_tpl_ne = cv2.imread("resources/krokust/ne.png")
-        self.sw_combat_pos = cv2.imread("resources/krokust/sw_combat_pos.png")
-        self.ne_combat_pos = cv2.imread("resources/krokust/ne_combat_pos.png")
-        self.enemy1 = cv2.imread("resources/krokust/se_chest.png")
-        self.enemy2 = cv2.imread("resources/krokust/sw_chest.png")
-        self.controller._delay = 0.166
+        self.exit_tpl_sw = TEMPLATES["krokust/sw"]
+        self.exit_tpl_ne = TEMPLATES["krokust/ne"]
+        self.sw_combat_pos = TEMPLATES["krokust/sw_combat_pos"]
+        self.ne_combat_pos = TEMPLATES["krokust/ne_combat_pos"]
+        self.enemy1 = TEMPLATES["krokust/se_chest"]
+        self.enemy2 = TEMPLATES["krokust/sw_chest"]
+        if "move" not in self.controller.delay_profile:
+            self.controller._delay = 0.166
 
     def portal(self) -> None:
         self.controller._tap((1000, 630))  # page +1
@@ -96,10 +98,15 @@ class BossKrokust(BossDain):
     def _find_combat_pos(self, dir: Direction) -> tuple[int, int]:
         logger.debug("Finding Krokust position...")
         box = None
+        gate = FrameGate()
         # TODO: add timeout
         while box is None:
+            frame = self._get_frame()
+            if not gate.is_new(frame, self.controller.device.frame_seq):
+                time.sleep(0.01)  # game has not rendered a new frame yet
+                continue
             box, _ = find_tpl(
-                self._get_frame(),
+                frame,
                 self.sw_combat_pos if dir == Direction.SW else self.ne_combat_pos,
                 score_threshold=0.8,
                 debug=self.debug,
@@ -116,24 +123,18 @@ class BossKrokust(BossDain):
     def open_chest(self, dir: Direction) -> bool:
         if dir == Direction.SW:
             self.controller.move_SW()
-            time.sleep(0.2)
+            self.controller.settle(0.2)
         return super().open_chest(dir)
 
-    def count_enemies(self, frame830x690: cv2.typing.MatLike) -> int:
+    def count_enemies(self, frame: FrameBundle) -> int:
         px, py = 830 // 2, 690 // 2
-        box, score = find_tpl(
-            frame830x690, self.enemy1, [1.0], score_threshold=0.83, debug=self.debug
+        hits = match_many(
+            frame.gray, [self.enemy1, self.enemy2], 0.83, "any", debug=self.debug
         )
-        if box is not None:
-            dist = hypot(box["cx"] - px, box["cy"] - py)
-            return 1 if dist < 255 else 0
-
-        box, score = find_tpl(
-            frame830x690, self.enemy2, [1.0], score_threshold=0.83, debug=self.debug
-        )
-        if box is not None:
-            dist = hypot(box["cx"] - px, box["cy"] - py)
-            return 1 if dist < 255 else 0
+        for box, score in hits:
+            if box is not None:
+                dist = hypot(box["cx"] - px, box["cy"] - py)
+                return 1 if dist < 255 else 0
 
         return 0
 
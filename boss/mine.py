@@ -7,12 +7,14 @@ import cv2
 from boss.boss import Boss
 from controller import Controller
 from detect_location import find_tpl, wait_for
-from frames import extract_game
+from frames import FrameBundle, extract_game
+from macro import Macro
 from model import Direction
 from sensor import MinimapSensor
+from templates import TEMPLATES
 
 logger = logging.getLogger(__name__)
-mine = cv2.imread("resources/mine.png", cv2.IMREAD_COLOR)
+mine = TEMPLATES["mine"]
 
 
 class BossMine(Boss):
@@ -45,12 +47,12 @@ class BossMine(Boss):
         self.map_xy = None
         self.no_combat_minions = True
         self.exit_check_type = "tpl"  # 'mask' | 'tpl'
-        self.exit_tpl_sw = cv2.imread("resources/mine/mine_sw.png")
+        self.exit_tpl_sw = TEMPLATES["mine/mine_sw"]
         self.exit_tpl_sw_threshold = 0.53
-        self.exit_tpl_ne = cv2.imread("resources/mine/mine_ne.png")
-        self.enemy1 = cv2.imread("resources/mine/enemy1.png")
-        self.enemy1_ne = cv2.imread("resources/mine/enemy1-ne.png")
-        self.enemy2 = cv2.imread("resources/mine/enemy2.png")
+        self.exit_tpl_ne = TEMPLATES["mine/mine_ne"]
+        self.enemy1 = TEMPLATES["mine/enemy1"]
+        self.enemy1_ne = TEMPLATES["mine/enemy1-ne"]
+        self.enemy2 = TEMPLATES["mine/enemy2"]
 
     def init_camera(self) -> None:
         self.sensor = MinimapSensor(
@@ -61,7 +63,7 @@ class BossMine(Boss):
         )
         self.controller.move_E()
 
-    def count_enemies(self, frame830x690: cv2.typing.MatLike) -> int:
+    def count_enemies(self, frame: FrameBundle) -> int:
         return 0
 
     def start_fight(self, dir: Direction) -> int:
@@ -72,73 +74,80 @@ class BossMine(Boss):
         logger.debug("Fighting boss Mine..." + dir.label)
 
         ne_route = [
-            self.controller.move_N,
-            self.controller.move_N,
-            self.controller.move_NE,
-            self.controller.move_NE,
-            self.controller.move_NE,
-            self.controller.move_NE,
-            self.controller.move_NE,
-            self.controller.move_NE,
-            self.controller.move_NE,
-            self.controller.move_NE,
-            self.controller.move_E,
-            self.controller.move_SE,
-            self.controller.move_S,
-            self.controller.move_SW,
-            self.controller.move_SW,
-            self.controller.move_SW,
-            self.controller.move_SW,
-            self.controller.move_SW,
-            self.controller.move_SW,
-            self.controller.move_SW,
+            "N",
+            "N",
+            "NE",
+            "NE",
+            "NE",
+            "NE",
+            "NE",
+            "NE",
+            "NE",
+            "NE",
+            "E",
+            "SE",
+            "S",
+            "SW",
+            "SW",
+            "SW",
+            "SW",
+            "SW",
+            "SW",
+            "SW",
         ]
-        ne_route.reverse()
 
         sw_route = [
-            self.controller.move_W,
-            self.controller.move_W,
-            self.controller.move_SW,
-            self.controller.move_SW,
-            self.controller.move_SW,
-            self.controller.move_SW,
-            self.controller.move_SW,
-            self.controller.move_SW,
-            self.controller.move_SW,
-            self.controller.move_SW,
-            self.controller.move_S,
-            self.controller.move_SE,
-            self.controller.move_E,
-            self.controller.move_NE,
-            self.controller.move_NE,
-            self.controller.move_NE,
-            self.controller.move_NE,
-            self.controller.move_NE,
-            self.controller.move_NE,
-            self.controller.move_NE,
+            "W",
+            "W",
+            "SW",
+            "SW",
+            "SW",
+            "SW",
+            "SW",
+            "SW",
+            "SW",
+            "SW",
+            "S",
+            "SE",
+            "E",
+            "NE",
+            "NE",
+            "NE",
+            "NE",
+            "NE",
+            "NE",
+            "NE",
         ]
-        sw_route.reverse()
 
         route = ne_route if dir == Direction.NE else sw_route
-        fight_end = cv2.imread("resources/figth_end.png", cv2.IMREAD_COLOR)
-        step = 0
-
-        while len(route) > 0:
-            route.pop()()
-            step += 1
-            if step < 12:
-                time.sleep(0.07)
-                continue
+        fight_end = TEMPLATES["figth_end"]
+
+        # Весь маршрут уходит на устройство одним скриптом. Первые 11 ходов -
+        # с паузой 0.07, после остальных окно 0.6с на проверку конца боя.
+        delay = self.controller._delay
+        macro = Macro()
+        for step, label in enumerate(route, 1):
+            macro.tap(
+                self.controller.move_points[label], delay + (0.07 if step < 12 else 0.6)
+            )
+        run = self.controller.run_macro(macro)
+        run.wait((delay + 0.07) * 11)
+
+        while True:
+            finished = run.done
             if wait_for(fight_end, lambda: extract_game(self._get_frame()), 0.6):
+                run.abort()
                 self.controller.wait_loading(timeout=30)
                 break
+            if finished:
+                break
 
         logger.debug("Finish boss Mine..." + dir.label)
         return 0
 
     def open_chest(self, dir: Direction) -> bool:
         self.controller.move_NE()
-        time.sleep(0.1)
+        self.controller.settle(0.1)
         self.controller.move_SW()
         return True
 
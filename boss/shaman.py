@@ -8,8 +8,10 @@ import numpy as np
 from boss.boss import Boss
 from controller import Controller
 from db import FA_BHALOR
+from frames import FrameBundle
 from model import Direction
 from sensor import FaSensor, MinimapSensor
+from templates import TEMPLATES
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +33,8 @@ class BossShaman(Boss):
         self.no_combat_minions = True
         self.exit_check_type = "tpl"  # 'mask' | 'tpl'
         self.exit_tpl_sw_threshold = 0.57
-        self.exit_tpl_sw = cv2.imread("resources/dain/sw.png")
-        self.exit_tpl_ne = cv2.imread("resources/dain/ne.png")
+        self.exit_tpl_sw = TEMPLATES["dain/sw"]
+        self.exit_tpl_ne = TEMPLATES["dain/ne"]
         self.fa_dir_threshold = {"ne": 23, "nw": 23, "se": 23, "sw": 23}
         self.ensure_movement = False
 
@@ -60,7 +62,7 @@ class BossShaman(Boss):
 
     def init_camera(self) -> None:
         self.controller.move_N()
-        time.sleep(0.2)
+        self.controller.settle(0.2)
         self.sensor = FaSensor(
             None,
             None,
@@ -77,14 +79,17 @@ class BossShaman(Boss):
         )
         self.ensure_movement = True
         self.controller.move_E()
-        time.sleep(0.2)
+        self.controller.settle(0.2)
         self.controller.move_SE()
 
-    def count_enemies(self, frame830x690: cv2.typing.MatLike) -> int:
+    def count_enemies(self, frame: FrameBundle) -> int:
         return 0
 
-    def find_purple_marker(self, hsv):
-        mask = cv2.inRange(hsv, (139, 183, 50), (152, 255, 85))
+    def color_ranges(self) -> dict:
+        return super().color_ranges() | {"marker": [((139, 183, 50), (152, 255, 85))]}
+
+    def find_purple_marker(self, frame: FrameBundle):
+        mask = self.colors.frame_mask(frame, "marker")
 
         num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(
             mask, connectivity=8
@@ -105,10 +110,10 @@ class BossShaman(Boss):
         center = (int(cx), int(cy))
         return (center, box), mask
 
-    def is_near_exit(self, hsv, bgr=None) -> tuple[bool, Direction | None]:
-        H, W = hsv.shape[:2]
+    def is_near_exit(self, frame: FrameBundle) -> tuple[bool, Direction | None]:
+        H, W = frame.game.shape[:2]
         # 1) находим фиолетовую метку
-        hit, mask = self.find_purple_marker(hsv)
+        hit, mask = self.find_purple_marker(frame)
         if hit is None:
             return False, None
 
@@ -138,7 +143,7 @@ class BossShaman(Boss):
             return verdict, dir
 
         # Отрисовка для отладки
-        dbg = hsv.copy()
+        dbg = frame.hsv.copy()
         cv2.circle(dbg, (mx, my), 8, (255, 0, 255), 2)
         cv2.circle(dbg, (px, py), 6, (0, 255, 0), -1)
         # Direction.SW
@@ -174,7 +179,7 @@ class BossShaman(Boss):
         self.controller.yes()
         time.sleep(0.1)
         self.controller.move_NW()
-        time.sleep(0.5)
+        self.controller.settle(0.5)
         # Somersault
         self.controller.skill_3((680, 330) if dir == Direction.SW else (590, 400))
         time.sleep(3.2)
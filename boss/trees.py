@@ -2,15 +2,14 @@ import logging
 import time
 from math import hypot
 
-import cv2
-
 from boss.boss import Boss
 from controller import Controller
 from db import FA_BHALOR
 from detect_location import find_tpl, wait_for
-from frames import extract_game
+from frames import FrameBundle, extract_game
 from model import Direction
 from sensor import FaSensor
+from templates import TEMPLATES
 
 logger = logging.getLogger(__name__)
 
@@ -35,9 +34,9 @@ class BossTrees(Boss):
         self.controller.attack()
         time.sleep(0.2)
         self.controller.move_NW()
-        time.sleep(0.2)
+        self.controller.settle(0.2)
 
-    def count_enemies(self, frame830x690: cv2.typing.MatLike) -> int:
+    def count_enemies(self, frame: FrameBundle) -> int:
         self.controller.attack()
         time.sleep(0.2)
         return 0
@@ -54,13 +53,11 @@ class BossTrees(Boss):
 
         return True
 
-    def is_near_exit_mask(
-        self, hsv: cv2.typing.MatLike
-    ) -> tuple[bool, Direction | None]:
+    def is_near_exit_mask(self, frame: FrameBundle) -> tuple[bool, Direction | None]:
         return False, None
 
     def portal(self) -> None:
-        mine = cv2.imread("resources/mine.png", cv2.IMREAD_COLOR)
+        mine = TEMPLATES["mine"]
         mine_box, _ = find_tpl(self._get_frame(), mine, score_threshold=0.34)
 
         if mine_box is None:
@@ -1,12 +1,11 @@
 import time
 
-import cv2
-
 from boss.boss import Boss
 from controller import Controller
 from db import FA_BHALOR
 from model import Direction
 from sensor import FaSensor
+from templates import TEMPLATES
 
 
 class BossTroll(Boss):
@@ -21,8 +20,8 @@ class BossTroll(Boss):
         self.exit_check_type = "tpl"  # 'mask' | 'tpl'
         self.exit_tpl_sw_threshold = 0.75
         self.exit_tpl_ne_threshold = 0.8
-        self.exit_tpl_sw = cv2.imread("resources/troll/sw.png")
-        self.exit_tpl_ne = cv2.imread("resources/troll/ne.png")
+        self.exit_tpl_sw = TEMPLATES["troll/sw"]
+        self.exit_tpl_ne = TEMPLATES["troll/ne"]
 
     def init_camera(self) -> None:
         self.sensor = FaSensor(
@@ -58,13 +57,13 @@ class BossTroll(Boss):
     def open_chest(self, dir: Direction) -> bool:
         if dir == Direction.NE:
             self.controller.move_NE()
-            time.sleep(0.5)
+            self.controller.settle(0.5)
 
         self.controller.skill_4((590, 390) if dir == Direction.SW else None)
 
         time.sleep(2.7)
         self.controller.move_S() if dir == Direction.SW else self.controller.move_E()
-        time.sleep(0.5)
+        self.controller.settle(0.5)
         return True
 
     def portal(self) -> None:
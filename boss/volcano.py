@@ -7,8 +7,10 @@ import cv2
 from boss.boss import Boss
 from controller import Controller
 from detect_location import find_tpl
+from frames import FrameBundle
 from model import Direction
 from sensor import MinimapSensor
+from templates import TEMPLATES
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +24,8 @@ class BossVolcano(Boss):
         self.no_combat_minions = True
         self.exit_check_type = "tpl"  # 'mask' | 'tpl'
         self.exit_tpl_sw_threshold = 0.57
-        self.exit_tpl_sw = cv2.imread("resources/dain/sw.png")
-        self.exit_tpl_ne = cv2.imread("resources/dain/ne.png")
+        self.exit_tpl_sw = TEMPLATES["dain/sw"]
+        self.exit_tpl_ne = TEMPLATES["dain/ne"]
         self.ensure_movement = False
 
         self.minimap_masks = {
@@ -57,10 +59,10 @@ class BossVolcano(Boss):
         )
         self.ensure_movement = True
         self.controller.move_E()
-        time.sleep(0.2)
+        self.controller.settle(0.2)
         self.controller.move_SE()
 
-    def count_enemies(self, frame830x690: cv2.typing.MatLike) -> int:
+    def count_enemies(self, frame: FrameBundle) -> int:
         return 0
 
     def start_fight(self, dir: Direction) -> int:
@@ -116,7 +118,7 @@ class BossVolcano(Boss):
         return hp
 
     def open_chest(self, dir: Direction) -> bool:
-        boss_chest = cv2.imread("resources/boss_chest.png", cv2.IMREAD_COLOR)
+        boss_chest = TEMPLATES["boss_chest"]
         # start_time = time.time()
         # box = None
         # while box is None and time.time() - start_time < 10:
@@ -127,19 +129,19 @@ class BossVolcano(Boss):
 
         # self.controller.attack((box["cx"], box["cy"]))
         self.controller.move_SE()
-        time.sleep(0.3)
+        self.controller.settle(0.3)
         self.controller.move_NW()
-        time.sleep(0.2)
+        self.controller.settle(0.2)
         self.controller.attack((650, 290) if dir == Direction.SW else (610, 330))
         self.controller.attack((650, 290) if dir == Direction.SW else (610, 330))
 
         time.sleep(2.3)
         self.controller.move_SE()
-        time.sleep(0.2)
+        self.controller.settle(0.2)
         self.controller.move_NW()
-        time.sleep(0.2)
+        self.controller.settle(0.2)
         self.controller.move_SE()
-        time.sleep(0.2)
+        self.controller.settle(0.2)
 
         box, _ = find_tpl(self._get_frame(), boss_chest, score_threshold=0.72)
         if box is not None:
@@ -22,12 +22,16 @@ from bot_utils.logger_memory import LastLogsHandler
 from bot_utils.screenshoter import save_image
 from controller import Controller
 from detect_boss_room import wait_for_boss_popup
-from detect_location import find_tpl, wait_for
+from detect_location import NET_ERROR_THRESHOLD, find_tpl, tpl_condition
 from devices.device import Device
+from devices.frame_bus import FrameBusSource
+from devices.frame_source import MinicapFrameSource
 from explorer import Explorer
 from frames import extract_game
 from maze_rh import MazeRH
 from model import Direction
+from templates import TEMPLATES
+from waiter import wait_any
 
 logging.basicConfig(
     format="%(asctime)s.%(msecs)03d %(module)s %(levelname)s: %(message)s",
@@ -59,7 +63,14 @@ class BotRunner:
     last_logs_handler: LastLogsHandler
     boss: Boss
 
-    def __init__(self, boss_type: str, debug=False):
+    def __init__(
+        self,
+        boss_type: str,
+        debug=False,
+        minicap_port: int | None = None,
+        frame_bus: str | None = None,
+        async_input: bool = False,
+    ):
         if isinstance(boss_type, str) and boss_type.lower() in self._boss_map:
             boss_class = self._boss_map[boss_type.lower()]
         else:
@@ -73,7 +84,19 @@ class BotRunner:
         self.controller = Controller(
             Device("127.0.0.1", 58526).connect(),
             debug,
+            async_input,
         )
+        # taps through one long-lived adb shell instead of a service per tap
+        self.controller.device.open_input_session()
+        if minicap_port is not None:
+            # adb forward tcp:<minicap_port> localabstract:minicap
+            self.controller.device.attach_frame_source(
+                MinicapFrameSource(port=minicap_port).start()
+            )
+        elif frame_bus is not None:
+            # frames captured once by a FramePublisher shared with other readers
+            self.controller.device.attach_frame_source(FrameBusSource(frame_bus))
+        TEMPLATES.load()  # all of resources/ once, no imread during runs
         self.boss = boss_class(self.controller, debug)
         self.explorer = Explorer(
             MazeRH(self.controller, self.boss, debug),
@@ -166,7 +189,11 @@ class BotRunner:
                 self.controller.move_SW(self.boss.enter_room_clicks)
 
             # wait for boss room
-            if not wait_for_boss_popup(self.boss._get_frame, timeout_s=10):
+            if not wait_for_boss_popup(
+                self.boss._get_frame,
+                timeout_s=10,
+                get_seq=lambda: self.controller.device.frame_seq,
+            ):
                 dir = dir.label if dir is not None else "None"
                 logger.info(
                     f"❌ #{self.run:03d} t:{time.time() - t0:.1f}s m:{moves:02d} r:fake exit dir:{dir}"
@@ -191,11 +218,8 @@ class BotRunner:
             # fight boss
             hp = self.boss.start_fight(dir)
 
-            self.controller.wait_loading()
             # close summary
-            if not wait_for(
-                "resources/figth_end.png", lambda: extract_game(self.boss._get_frame())
-            ):
+            if not self.wait_fight_end():
                 save_image(
                     self.boss._get_frame(),
                     f"fails/figth_end_{time.strftime('%H-%M-%S')}.png",
@@ -237,15 +261,39 @@ class BotRunner:
             # )
             self.boss.back()
 
+    def wait_fight_end(self, timeout_s=8) -> bool:
+        """
+        Итог боя. Лоадер после боя отдельно не ждём: итог появится, когда он
+        пропадёт. Ошибку сети закрывает wait_loading (retry), потом ждём дальше.
+        """
+        conditions = [
+            tpl_condition("figth_end", TEMPLATES["figth_end"]),
+            tpl_condition("net_error", TEMPLATES["net_error"], NET_ERROR_THRESHOLD[1]),
+        ]
+        t0 = time.time()
+        while (left := timeout_s - (time.time() - t0)) > 0:
+            found, _ = wait_any(
+                lambda: extract_game(self.boss._get_frame()),
+                conditions,
+                left,
+                get_seq=lambda: self.controller.device.frame_seq,
+            )
+            if found != "net_error":
+                return found is not None
+            self.controller.wait_loading(0.5)
+        return False
+
     def check_main_map(self):
-        monetia = cv2.imread("resources/monetia.png", cv2.IMREAD_COLOR)
-        monetia_box, _ = find_tpl(self.boss._get_frame(), monetia, score_threshold=0.9)
+        monetia = TEMPLATES["monetia"]
+        monetia_box, _ = find_tpl(
+            self.boss._get_frame(), monetia, score_threshold=0.9, pyramid=2
+        )
         if monetia_box:
             self.controller._tap((monetia_box["x"], monetia_box["y"]))
             time.sleep(3)
 
     def check_town(self):
-        pub = cv2.imread("resources/pub3.png", cv2.IMREAD_COLOR)
+        pub = TEMPLATES["pub3"]
         pub_box, _ = find_tpl(self.boss._get_frame(), pub, score_threshold=0.9)
         if pub_box:
             self.controller._tap((pub_box["x"], pub_box["y"]))
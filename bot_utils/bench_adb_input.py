@@ -0,0 +1,77 @@
+"""
+Задержка отправки тапа: новый shell-сервис на команду против одного
+долгоживущего `shell:` (AdbInputSession), на локальном фейковом adb-сервере.
+
+    python bot_utils/bench_adb_input.py [taps] [exec_delay_ms]
+
+exec_delay_ms имитирует время самой `input tap` на устройстве.
+"""
+
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, ".")
+from bot_utils.fake_adb import FakeAdbServer  # noqa: E402
+from devices.adb_input import AdbInputSession  # noqa: E402
+from macro import Macro  # noqa: E402
+
+
+def bench(name, tap, n):
+    times = []
+    for i in range(n):
+        t0 = time.perf_counter()
+        tap(f"input tap {i % 1280} 500")
+        times.append(time.perf_counter() - t0)
+    times = np.array(times) * 1e3
+    print(
+        f"{name:<28} median {np.median(times):7.3f} ms  "
+        f"p95 {np.percentile(times, 95):7.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    exec_delay = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+
+    server = FakeAdbServer(exec_delay=exec_delay)
+    port = server.start()
+
+    session = AdbInputSession("127.0.0.1:58526", port=port)
+    # как shell() на команду: соединение, transport, shell:<cmd>, ждать конца
+    bench("service per command", session.exec_once, n)
+    services = server.services
+
+    session.connect()
+    bench("session, wait for completion", session.run, n)
+    bench("session, dispatch only", lambda cmd: session.run(cmd, wait=False), n)
+    session.wait()
+
+    # маршрут из 20 ходов с паузой 0.17с: тапы из хоста против одного скрипта
+    route = Macro()
+    for i in range(20):
+        route.tap((170, 540), 0.17)
+    t0 = time.perf_counter()
+    for cmd in route.commands():
+        if cmd.startswith("sleep"):
+            time.sleep(float(cmd.split()[1]))
+        else:
+            session.exec_once(cmd)
+    host_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    marker = session.run(route.compile(), wait=False)
+    dispatch_ms = (time.perf_counter() - t0) * 1e3
+    session.wait(marker, timeout=30)
+    print(
+        f"route of 20 moves: host loop {host_s:.2f} s, "
+        f"macro {time.perf_counter() - t0:.2f} s (dispatch {dispatch_ms:.3f} ms), "
+        f"planned {route.duration:.2f} s"
+    )
+    session.close()
+
+    print(
+        f"commands={len(server.commands)} shell services: "
+        f"per-command={services} session={server.services - services}"
+    )
+    server.stop()
@@ -0,0 +1,77 @@
+"""
+Стоимость decode + поиска шаблона в wait-циклах при уменьшенном декодировании.
+
+    python bot_utils/bench_decode_scale.py [frame.png|frame.jpg] [iterations]
+
+Для каждого масштаба: imdecode(IMREAD_REDUCED_COLOR_*) + те же проверки, что
+делают wait_loading / check_main_map, и найденные координаты (в полном кадре).
+"""
+
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, ".")
+from detect_location import LOADER_THRESHOLD, crop_loader_roi, find_tpl  # noqa: E402
+from devices.frame_source import _DECODE_FLAGS  # noqa: E402
+from frames import ROIS  # noqa: E402
+
+
+def synthetic_frame():
+    """Кадр 1280x690 с лоадером и monetia на известных местах."""
+    rng = np.random.default_rng(0)
+    frame = cv2.resize(
+        rng.integers(0, 120, (69, 128, 3), dtype=np.uint8),
+        (1280, 690),
+        interpolation=cv2.INTER_LINEAR,
+    )
+    loader = cv2.imread("resources/loader_1.png", cv2.IMREAD_COLOR)
+    lx, ly = ROIS["loader"][0] + 90, ROIS["loader"][1] + 15
+    frame[ly : ly + loader.shape[0], lx : lx + loader.shape[1]] = loader
+    monetia = cv2.imread("resources/monetia.png", cv2.IMREAD_COLOR)
+    frame[300 : 300 + monetia.shape[0], 700 : 700 + monetia.shape[1]] = monetia
+    print(f"loader at {(lx, ly)}, monetia at (700, 300)")
+    return frame
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        frame = cv2.imread(sys.argv[1], cv2.IMREAD_COLOR)
+    else:
+        frame = synthetic_frame()
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    jpeg = np.frombuffer(
+        cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 90])[1], np.uint8
+    )
+    loader = cv2.imread("resources/loader_1.png", cv2.IMREAD_COLOR)
+    monetia = cv2.imread("resources/monetia.png", cv2.IMREAD_COLOR)
+
+    base = None
+    for scale in (1, 2):
+        flag = _DECODE_FLAGS[scale]
+        t0 = time.perf_counter()
+        for _ in range(n):
+            img = cv2.imdecode(jpeg, flag)
+        t_decode = (time.perf_counter() - t0) / n
+
+        t0 = time.perf_counter()
+        for _ in range(n):
+            box_l, score_l = find_tpl(
+                crop_loader_roi(img, scale),
+                loader,
+                score_threshold=LOADER_THRESHOLD[scale],
+                scale=scale,
+            )
+            box_m, score_m = find_tpl(img, monetia, score_threshold=0.85, scale=scale)
+        t_match = (time.perf_counter() - t0) / n
+
+        total = t_decode + t_match
+        base = base or total
+        print(
+            f"1/{scale}: {img.shape[1]}x{img.shape[0]}  decode {t_decode * 1e3:6.2f} ms"
+            f"  match {t_match * 1e3:6.2f} ms  x{base / total:4.1f}"
+            f"  loader {score_l:.3f} {box_l and (box_l['x'], box_l['y'])}"
+            f"  monetia {score_m:.3f} {box_m and (box_m['x'], box_m['y'])}"
+        )
@@ -0,0 +1,92 @@
+"""
+Скорость и совместимость подписи движения (edges_diff) с прежней реализацией
+на питоновских циклах.
+
+    python bot_utils/bench_edges_diff.py [frame.png ...] [--n 2000]
+
+Без кадров - случайные. Подписи и расстояния должны совпасть байт в байт:
+пороги MazeRH и bot_utils/calibrate_delays.py подобраны под них.
+"""
+
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, ".")
+from edges_diff import _dhash_bytes, _edge_image, bytes_hamming  # noqa: E402
+
+MOVE_ROI = (15, 120, 1255, 415)
+
+
+def dhash_bytes_loop(gray, hash_size=16):
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    diff = (small[:, 1:] > small[:, :-1]).astype(np.uint8).ravel()
+    out, acc, k = [], 0, 0
+    for bit in diff:
+        acc = (acc << 1) | int(bit)
+        k += 1
+        if k == 8:
+            out.append(acc)
+            acc = 0
+            k = 0
+    if k:
+        out.append(acc << (8 - k))
+    return bytes(out)
+
+
+def bytes_hamming_loop(a: bytes, b: bytes) -> int:
+    n = min(len(a), len(b))
+    return sum((x ^ y).bit_count() for x, y in zip(a[:n], b[:n]))
+
+
+def timeit(fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def edge_images(paths):
+    x, y, w, h = MOVE_ROI
+    if paths:
+        frames = [cv2.imread(p, cv2.IMREAD_COLOR) for p in paths]
+    else:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (720, 1280, 3), np.uint8) for _ in range(20)]
+    hsv = [cv2.cvtColor(f[y : y + h, x : x + w], cv2.COLOR_BGR2HSV) for f in frames]
+    return [_edge_image(img) for img in hsv]
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    n = 2000
+    if "--n" in args:
+        i = args.index("--n")
+        n = int(args[i + 1])
+        del args[i : i + 2]
+    images = edge_images(args)
+
+    # совместимость: на кадрах, случайных картинках и нечётных размерах хеша
+    rng = np.random.default_rng(1)
+    extra = [rng.integers(0, 256, (32, 32), np.uint8) for _ in range(500)]
+    checked = 0
+    for img in images + extra:
+        for hash_size in (16, 8, 5):
+            assert _dhash_bytes(img, hash_size) == dhash_bytes_loop(img, hash_size)
+            checked += 1
+    sigs = [_dhash_bytes(img) for img in images + extra]
+    for a, b in zip(sigs, sigs[1:] + sigs[:1]):
+        assert bytes_hamming(a, b) == bytes_hamming_loop(a, b)
+        assert bytes_hamming(a, b[:20]) == bytes_hamming_loop(a, b[:20])
+    print(f"{checked} hashes and {2 * len(sigs)} distances match the loop version")
+
+    img, a, b = images[0], sigs[0], sigs[1]
+    for name, fn in (
+        ("dhash loop", lambda: dhash_bytes_loop(img)),
+        ("dhash packbits", lambda: _dhash_bytes(img)),
+        ("hamming loop", lambda: bytes_hamming_loop(a, b)),
+        ("hamming int", lambda: bytes_hamming(a, b)),
+    ):
+        print(f"{name:<15} {timeit(fn, n):7.2f} us")
@@ -0,0 +1,96 @@
+"""
+Пропускная способность приёма minicap-потока на локальной заглушке сокета.
+
+    python bot_utils/bench_minicap.py [frames] [recorded_frames_dir]
+
+Сравнивает старый путь приёма (recv + bytearray.extend + bytes) с
+recv_into в переиспользуемый буфер и считает аллокации Python на кадр.
+"""
+
+import struct
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, ".")
+from bot_utils.fake_minicap import FakeMinicapServer  # noqa: E402
+from devices.minicap_client import MinicapClient  # noqa: E402
+
+
+def legacy_read_frame(client: MinicapClient):
+    """Прежний путь приёма: новый bytearray на каждый chunk + копия в bytes."""
+
+    def read_exact(n):
+        data = bytearray()
+        while len(data) < n:
+            chunk = client.sock.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("minicap: соединение закрыто")
+            data.extend(chunk)
+        return bytes(data)
+
+    size = struct.unpack("<I", read_exact(4))[0]
+    return read_exact(size)
+
+
+def synthetic_frames(n=8):
+    """1280x690 кадры с деталями, чтобы JPEG был реалистичного размера."""
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(n):
+        img = cv2.resize(
+            rng.integers(0, 255, (69, 128, 3), dtype=np.uint8),
+            (1280, 690),
+            interpolation=cv2.INTER_NEAREST,
+        )
+        frames.append(cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 90])[1])
+    return [f.tobytes() for f in frames]
+
+
+def bench(name, read, client, n, decode=False):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    total = 0
+    for _ in range(n):
+        jpeg = read(client)
+        total += len(jpeg)
+        if decode:
+            cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+        del jpeg
+    dt = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<28} {n / dt:8.1f} fps  {total / dt / 1e6:7.1f} MB/s  "
+        f"peak py-alloc {peak / 1024:8.1f} KiB"
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    if len(sys.argv) > 2:
+        server = FakeMinicapServer.from_dir(sys.argv[2], fps=0)
+    else:
+        server = FakeMinicapServer(synthetic_frames(), fps=0)
+    port = server.start()
+    print(
+        f"avg jpeg {sum(map(len, server.frames)) / len(server.frames) / 1024:.0f} KiB"
+    )
+
+    cases = [
+        ("legacy recv+extend+bytes", legacy_read_frame, False),
+        ("recv_into reused buffer", MinicapClient.read_frame, False),
+        ("legacy + imdecode", legacy_read_frame, True),
+        ("recv_into + imdecode", MinicapClient.read_frame, True),
+    ]
+    for name, read, decode in cases:
+        client = MinicapClient(port=port)
+        client.connect()
+        read(client)  # прогрев: буферы выросли до размера кадра
+        bench(name, read, client, n, decode)
+        client.close()
+
+    server.stop()
@@ -0,0 +1,63 @@
+"""
+Задержка кадра: `screencap -p` (PNG) против сырого `screencap`.
+
+    python bot_utils/bench_screencap.py [frames] [frame.png]   # заглушка adb
+    python bot_utils/bench_screencap.py [frames] --device       # Device() по ADB
+
+С заглушкой PNG кодируется на хосте вместо устройства, так что цифры
+показывают порядок, а не время конкретного телефона; передачу по сети
+(raw в ~4 раза больше PNG) честно меряет только --device.
+"""
+
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, ".")
+from bot_utils.fake_adb import FakeAdbDevice  # noqa: E402
+from devices.screencap import grab_raw_screencap  # noqa: E402
+from frames import ROIS  # noqa: E402
+
+
+def png_frame(adb):
+    raw = adb.shell("screencap -p", decode=False)
+    return cv2.imdecode(np.frombuffer(raw, np.uint8), cv2.IMREAD_COLOR)
+
+
+def bench(name, grab, n):
+    grab()  # прогрев
+    times = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        frame = grab()
+        times.append(time.perf_counter() - t0)
+    times = np.array(times) * 1e3
+    print(
+        f"{name:<22} {frame.shape[1]}x{frame.shape[0]}  "
+        f"median {np.median(times):7.2f} ms  p95 {np.percentile(times, 95):7.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    if "--device" in sys.argv:
+        from devices.device import Device
+
+        adb = Device("127.0.0.1", 58526).connect().device
+    else:
+        if len(sys.argv) > 2:
+            frame = cv2.imread(sys.argv[2], cv2.IMREAD_COLOR)
+        else:
+            rng = np.random.default_rng(0)
+            frame = cv2.resize(
+                rng.integers(0, 255, (72, 128, 3), dtype=np.uint8),
+                (1280, 720),
+                interpolation=cv2.INTER_LINEAR,
+            )
+        adb = FakeAdbDevice([frame])
+
+    bench("screencap -p (PNG)", lambda: png_frame(adb), n)
+    bench("screencap raw", lambda: grab_raw_screencap(adb), n)
+    bench("screencap raw + crop", lambda: grab_raw_screencap(adb, ROIS["game"]), n)
@@ -0,0 +1,175 @@
+"""
+Калибровка пауз под эту машину: тап -> через сколько кадр заметно изменился
+и когда успокоился. По распределениям задержек пишет delay_profile.json,
+который Controller и боссы читают при старте.
+
+    python bot_utils/calibrate_delays.py [trials] [--minicap PORT] [--print]
+
+Запускать в лабиринте на открытой клетке без врагов: шаг E/W туда-обратно,
+прицел skill 1 с отменой, удар, back с закрытием диалога вторым back.
+--print - только показать результат, не перезаписывая профиль.
+
+Время кадра - середина его захвата (get_frame2), время тапа - момент вызова,
+так что в задержку входит и отправка через adb.
+"""
+
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, ".")
+from controller import Controller  # noqa: E402
+from delay_profile import DELAY_PROFILE, save_delay_profile  # noqa: E402
+from devices.device import Device  # noqa: E402
+from edges_diff import bytes_hamming, roi_edge_signature  # noqa: E402
+from frames import FrameBundle, FrameGate  # noqa: E402
+
+CHANGE_BITS = 12  # сигнатура отошла от исходной - реакция на тап видна
+SETTLE_BITS = 6  # соседние отрисованные кадры почти равны...
+SETTLE_FRAMES = 2  # ...столько раз подряд - анимация закончилась
+ROI = (15, 120, 1255, 415)  # игровое поле, как у MazeRH._is_moved
+
+
+def grab(controller: Controller, gate: FrameGate) -> tuple[float, FrameBundle | None]:
+    """(время кадра, кадр) или (время, None), если кадр не отрисован заново."""
+    t0 = time.perf_counter()
+    frame = controller.get_frame()
+    t1 = time.perf_counter()
+    if not gate.is_new(frame, controller.device.frame_seq):
+        return (t0 + t1) / 2, None
+    return (t0 + t1) / 2, FrameBundle(frame, gate.seq)
+
+
+def measure(controller: Controller, act, roi, timeout=1.5):
+    """(задержка до первого изменения, до успокоения) в секундах или None."""
+    gate = FrameGate()
+    _, bundle = grab(controller, gate)
+    before = roi_edge_signature(bundle, roi)
+    t_tap = time.perf_counter()
+    act()
+    changed = settled = None
+    last, calm, t_calm = None, 0, None
+    while time.perf_counter() - t_tap < timeout:
+        t, bundle = grab(controller, gate)
+        if bundle is None:
+            # захват повторил прошлый кадр: ни изменения, ни покоя он не значит
+            time.sleep(0.002)
+            continue
+        signature = roi_edge_signature(bundle, roi)
+        if changed is None:
+            if bytes_hamming(before, signature) >= CHANGE_BITS:
+                changed = t - t_tap
+        elif bytes_hamming(last, signature) <= SETTLE_BITS:
+            # успокоение - первый из SETTLE_FRAMES спокойных кадров подряд
+            calm += 1
+            t_calm = t_calm if calm > 1 else t
+            if calm >= SETTLE_FRAMES:
+                settled = t_calm - t_tap
+                break
+        else:
+            calm = 0
+        last = signature
+    return changed, settled
+
+
+def frame_interval(controller: Controller, n=20) -> float:
+    """Медиана интервала между снимками - от него запас в полкадра."""
+    times, seq = [], None
+    while len(times) < n:
+        t0 = time.perf_counter()
+        controller.get_frame()
+        t1 = time.perf_counter()
+        if controller.device.frame_seq != seq:
+            times.append((t0 + t1) / 2)
+            seq = controller.device.frame_seq
+    return float(np.median(np.diff(times)))
+
+
+def calibrate(controller: Controller, trials: int):
+    c = controller
+    roi = ROI
+    tap = c._tap
+    actions = {
+        # действие: (тап, возврат в исходное состояние)
+        "move": (
+            lambda: tap(c.move_points["E"]),
+            lambda: (tap(c.move_points["W"]), time.sleep(0.6)),
+        ),
+        "skill": (
+            lambda: tap(c.skill_1_point),
+            lambda: (tap(c.skill_1_point_cancel), time.sleep(0.4)),
+        ),
+        "attack": (
+            lambda: c.device.input("input tap 1100 450"),
+            lambda: time.sleep(0.8),
+        ),
+        "back": (
+            lambda: c.device.input("input keyevent 4"),
+            lambda: (c.device.input("input keyevent 4"), time.sleep(0.6)),
+        ),
+    }
+    samples: dict[str, tuple[list, list]] = {}
+    for name, (act, undo) in actions.items():
+        changed, settled = [], []
+        for _ in range(trials):
+            ch, st = measure(c, act, roi)
+            undo()
+            if ch is not None:
+                changed.append(ch)
+            if st is not None:
+                settled.append(st)
+        samples[name] = (changed, settled)
+        print(f"{name:<7} reacted {len(changed)}/{trials}  settled {len(settled)}")
+    return samples
+
+
+def tune(samples, interval: float) -> tuple[dict[str, float], dict]:
+    """p90 нужной задержки плюс полкадра на то, где внутри кадра была реакция."""
+    stats, delays = {}, {}
+    for name, (changed, settled) in samples.items():
+        stats[name] = {
+            key: {
+                "n": len(values),
+                "median": round(float(np.median(values)), 3),
+                "p90": round(float(np.percentile(values, 90)), 3),
+                "max": round(float(np.max(values)), 3),
+            }
+            for key, values in (("changed", changed), ("settled", settled))
+            if values
+        }
+    margin = interval / 2
+    # шаг: следующий тап - когда персонаж дошёл; остальное - когда видна реакция
+    wanted = {
+        "move": "settled",
+        "skill": "changed",
+        "attack": "changed",
+        "back": "changed",
+    }
+    for name, key in wanted.items():
+        if key in stats.get(name, {}):
+            delays[name] = stats[name][key]["p90"] + margin
+    stats["frame_interval"] = round(interval, 4)
+    return delays, stats
+
+
+if __name__ == "__main__":
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 15
+    device = Device("127.0.0.1", 58526).connect()
+    device.open_input_session()
+    if "--minicap" in sys.argv:
+        from devices.frame_source import MinicapFrameSource
+
+        port = int(sys.argv[sys.argv.index("--minicap") + 1])
+        device.attach_frame_source(MinicapFrameSource(port=port).start())
+    controller = Controller(device)
+
+    interval = frame_interval(controller)
+    print(f"frame interval {interval * 1e3:.1f} ms")
+    delays, stats = tune(calibrate(controller, trials), interval)
+    for name, value in delays.items():
+        print(f"{name:<13} {value:.3f} s")
+    if "--print" not in sys.argv:
+        save_delay_profile(delays, stats)
+        print(f"saved {DELAY_PROFILE}")
+    device.close()
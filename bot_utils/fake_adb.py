@@ -0,0 +1,213 @@
+import shlex
+import socket
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class FakeAdbDevice:
+    """
+    Заглушка AdbDeviceTcp для прогона без устройства: отвечает на
+    `screencap` / `screencap -p` кадрами из списка и запоминает остальные
+    shell-команды (input tap ...) в self.commands.
+
+        adb = FakeAdbDevice([cv2.imread("images/img_0.png")])
+        frame = grab_raw_screencap(adb)
+
+    PNG кодируется на каждый запрос, как это делает screencap -p на устройстве.
+    """
+
+    def __init__(self, frames: list[np.ndarray], header_size: int = 16) -> None:
+        if not frames:
+            raise ValueError("FakeAdbDevice needs at least one frame")
+        if header_size not in (12, 16):
+            raise ValueError("screencap header is 12 or 16 bytes")
+        self.frames = frames
+        self.header_size = header_size
+        self.commands: list[str] = []
+        self._i = 0
+
+    def _next_frame(self) -> np.ndarray:
+        frame = self.frames[self._i % len(self.frames)]
+        self._i += 1
+        return frame
+
+    def raw_screencap(self, frame: np.ndarray) -> bytes:
+        h, w = frame.shape[:2]
+        header = struct.pack("<III", w, h, 1)  # PIXEL_FORMAT_RGBA_8888
+        if self.header_size == 16:
+            header += struct.pack("<I", 1)  # colorspace sRGB
+        return header + cv2.cvtColor(frame, cv2.COLOR_BGR2RGBA).tobytes()
+
+    def shell(self, command: str, decode: bool = True, **kwargs):
+        if command == "screencap":
+            out = self.raw_screencap(self._next_frame())
+        elif command == "screencap -p":
+            out = cv2.imencode(".png", self._next_frame())[1].tobytes()
+        else:
+            self.commands.append(command)
+            out = b""
+        return out.decode() if decode else out
+
+    def is_connected(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class FakeAdbServer:
+    """
+    Локальный adb-сервер (smart-socket протокол) для прогона AdbInputSession
+    без устройства. Понимает host:connect, host:transport, интерактивный
+    `shell:` (с эхом, как у pty) и разовый `shell:<cmd>`. Все команды, кроме
+    echo, попадают в self.commands; exec_delay имитирует время `input`.
+
+        server = FakeAdbServer(exec_delay=0.05)
+        port = server.start()
+        session = AdbInputSession("127.0.0.1:58526", port=port).connect()
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, exec_delay=0.0):
+        self.host = host
+        self.port = port
+        self.exec_delay = exec_delay
+        self.commands: list[str] = []
+        self.services = 0  # открыто shell-сервисов
+        self._killed = threading.Event()
+        self._sock: socket.socket | None = None
+        self._running = False
+
+    def start(self) -> int:
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen(8)
+        self.port = self._sock.getsockname()[1]
+        self._running = True
+        threading.Thread(target=self._serve, daemon=True).start()
+        return self.port
+
+    def stop(self) -> None:
+        self._running = False
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _serve(self) -> None:
+        while self._running:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._client, args=(conn,), daemon=True).start()
+
+    @staticmethod
+    def _okay(conn, message: str | None = None) -> None:
+        reply = b"OKAY"
+        if message is not None:
+            reply += b"%04x" % len(message) + message.encode()
+        conn.sendall(reply)
+
+    def _client(self, conn: socket.socket) -> None:
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with conn:
+            try:
+                while True:
+                    size = int(self._recv_exact(conn, 4), 16)
+                    service = self._recv_exact(conn, size).decode()
+                    if service.startswith("host:connect:"):
+                        serial = service.split(":", 2)[2]
+                        self._okay(conn, f"already connected to {serial}")
+                        return
+                    if service.startswith("host:transport:"):
+                        self._okay(conn)
+                    elif service == "shell:":
+                        self._okay(conn)
+                        self.services += 1
+                        self._interactive(conn)
+                        return
+                    elif service.startswith("shell:"):
+                        self._okay(conn)
+                        self.services += 1
+                        conn.sendall(self._execute(service[len("shell:") :]))
+                        return
+                    else:
+                        msg = f"unknown service {service}"
+                        conn.sendall(b"FAIL" + b"%04x" % len(msg) + msg.encode())
+                        return
+            except (OSError, ValueError):
+                return
+
+    def _interactive(self, conn: socket.socket) -> None:
+        buf = b""
+        while self._running:
+            chunk = conn.recv(4096)
+            if not chunk:
+                return
+            buf += chunk
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                conn.sendall(line + b"\r\n")  # эхо pty
+                conn.sendall(self._execute(line.decode()))
+
+    def _execute(self, line: str) -> bytes:
+        """Мини-shell: `;`, echo, sleep, `sh -c '...'` и kill для макросов."""
+        lexer = shlex.shlex(line, posix=True, punctuation_chars=";")
+        lexer.whitespace_split = True
+        commands, current = [], []
+        for token in lexer:
+            if token == ";":
+                commands.append(current)
+                current = []
+            else:
+                current.append(token)
+        commands.append(current)
+
+        out = b""
+        for argv in filter(None, commands):
+            if argv[:2] == ["sh", "-c"]:
+                self._killed.clear()  # новый скрипт
+                out += self._execute(argv[2])
+            elif argv[0] == "echo":
+                if ">" not in argv:
+                    out += " ".join(argv[1:]).encode() + b"\r\n"
+            elif argv[0] == "sleep":
+                if self._killed.wait(float(argv[1])):
+                    break  # скрипт убит через kill
+            elif argv[0] == "kill":
+                self._killed.set()
+            else:
+                self.commands.append(" ".join(argv))
+                if self.exec_delay:
+                    time.sleep(self.exec_delay)
+        return out
+
+    @staticmethod
+    def _recv_exact(conn: socket.socket, n: int) -> bytes:
+        data = b""
+        while len(data) < n:
+            chunk = conn.recv(n - len(data))
+            if not chunk:
+                raise OSError("closed")
+            data += chunk
+        return data
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.path.insert(0, ".")
+    from devices.screencap import grab_raw_screencap
+
+    frame = np.random.default_rng(0).integers(0, 255, (720, 1280, 3), np.uint8)
+    adb = FakeAdbDevice([frame])
+    t0 = time.perf_counter()
+    got = grab_raw_screencap(adb)
+    print(
+        f"raw screencap {got.shape} equal={np.array_equal(got, frame)} "
+        f"{(time.perf_counter() - t0) * 1e3:.1f} ms"
+    )
@@ -0,0 +1,133 @@
+import glob
+import os
+import socket
+import struct
+import threading
+import time
+
+import cv2
+
+
+class FakeMinicapServer:
+    """
+    Локальный TCP-сервер, имитирующий minicap: отдаёт баннер и затем по кругу
+    проигрывает записанные JPEG-кадры. Нужен, чтобы гонять MinicapClient /
+    MinicapFrameSource без устройства.
+
+        server = FakeMinicapServer.from_dir("images/stream")
+        port = server.start()
+        ...
+        server.stop()
+    """
+
+    def __init__(
+        self,
+        frames: list[bytes],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        fps: float = 30.0,
+        loop: bool = True,
+        size: tuple[int, int] = (1280, 690),
+    ) -> None:
+        if not frames:
+            raise ValueError("FakeMinicapServer needs at least one frame")
+        self.frames = frames
+        self.host = host
+        self.port = port
+        self.fps = fps
+        self.loop = loop
+        self.size = size
+        self.sent = 0
+        self._sock: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    @classmethod
+    def from_dir(cls, path: str, **kwargs) -> "FakeMinicapServer":
+        """Загрузить *.jpg как есть, *.png перекодировать в JPEG."""
+        frames = []
+        for file in sorted(glob.glob(os.path.join(path, "*"))):
+            ext = os.path.splitext(file)[1].lower()
+            if ext in (".jpg", ".jpeg"):
+                with open(file, "rb") as f:
+                    frames.append(f.read())
+            elif ext == ".png":
+                ok, jpeg = cv2.imencode(".jpg", cv2.imread(file, cv2.IMREAD_COLOR))
+                if ok:
+                    frames.append(jpeg.tobytes())
+        return cls(frames, **kwargs)
+
+    def banner(self) -> bytes:
+        w, h = self.size
+        # version, length, pid, realW, realH, virtW, virtH, orientation, quirks
+        return struct.pack("<BBIIIIIBB", 1, 24, os.getpid(), w, h, w, h, 0, 0)
+
+    def start(self) -> int:
+        """Запустить сервер в фоне; вернуть фактический порт."""
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen(1)
+        self.port = self._sock.getsockname()[1]
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self) -> None:
+        self._running = False
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _serve(self) -> None:
+        while self._running:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return  # сокет закрыт в stop()
+            with conn:
+                try:
+                    self._stream(conn)
+                except OSError:
+                    pass  # клиент отключился
+
+    def _stream(self, conn: socket.socket) -> None:
+        conn.sendall(self.banner())
+        interval = 1.0 / self.fps if self.fps > 0 else 0.0
+        i = 0
+        next_t = time.perf_counter()
+        while self._running:
+            if i >= len(self.frames):
+                if not self.loop:
+                    return
+                i = 0
+            jpeg = self.frames[i]
+            conn.sendall(struct.pack("<I", len(jpeg)))
+            conn.sendall(jpeg)
+            self.sent += 1
+            i += 1
+            if interval:
+                next_t += interval
+                delay = next_t - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python -m bot_utils.fake_minicap images/stream 1313
+    path = sys.argv[1] if len(sys.argv) > 1 else "images"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 1313
+
+    server = FakeMinicapServer.from_dir(path, port=port)
+    print(f"[fake minicap] {len(server.frames)} frames on 127.0.0.1:{server.start()}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
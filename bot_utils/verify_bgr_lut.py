@@ -0,0 +1,91 @@
+"""
+Проверка BGR_LUT: маски через таблицу BGR -> классы должны совпадать бит в
+бит с inRange по HSV на записанных кадрах, для палитры каждого босса.
+
+    python bot_utils/verify_bgr_lut.py images/*.png [--n 50]
+
+Кадры - полные скриншоты 1280x690+ (bot_utils/screenshoter.py). Палитры:
+color_ranges() боссов (игровое поле) и minimap_masks, заданные на классе
+(миникарта). Таблицы строятся при первом запуске и остаются в LUT_DIR.
+"""
+
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, ".")
+from boss import Boss  # noqa: E402
+from color_classes import BgrColorClasses, ColorClasses  # noqa: E402
+from frames import FrameBundle  # noqa: E402
+from sensor import minimap_classes  # noqa: E402
+
+
+def boss_classes(cls=Boss):
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from boss_classes(sub)
+
+
+def palettes():
+    """(имя, классы, какая часть кадра) для всех боссов."""
+    seen = set()
+    for cls in boss_classes():
+        # color_ranges читает только атрибуты класса, __init__ не нужен
+        ranges = cls.color_ranges(cls.__new__(cls))
+        key = repr(ranges)
+        if key not in seen:
+            seen.add(key)
+            yield cls.__name__, ranges, "game"
+        if isinstance(cls.minimap_masks, dict):
+            classes = minimap_classes(cls.minimap_masks).classes
+            yield f"{cls.__name__}.minimap", classes, "minimap"
+
+
+def timeit(fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e3
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    n = 50
+    if "--n" in args:
+        i = args.index("--n")
+        n = int(args[i + 1])
+        del args[i : i + 2]
+    frames = [FrameBundle(cv2.imread(p, cv2.IMREAD_COLOR)) for p in args]
+    if not frames:
+        sys.exit(__doc__)
+
+    failed = 0
+    for name, classes, part in palettes():
+        before = failed
+        hsv_classes = ColorClasses(classes)
+        bgr_classes = BgrColorClasses(classes)
+        for path, frame in zip(args, frames):
+            bgr = getattr(frame, part)
+            hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+            for cls_name in hsv_classes.class_bits:
+                expected = np.zeros(hsv.shape[:2], np.uint8)
+                for lo, hi in classes[cls_name]:
+                    expected |= cv2.inRange(hsv, lo, hi)
+                diff = cv2.countNonZero(expected ^ bgr_classes.mask(bgr, cls_name))
+                if diff:
+                    failed += 1
+                    print(f"MISMATCH {name}/{cls_name} {path}: {diff} px")
+
+        bgr = getattr(frames[0], part)
+        t_hsv = timeit(
+            lambda: hsv_classes.masks(cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)), n
+        )
+        t_bgr = timeit(lambda: bgr_classes.masks(bgr), n)
+        verdict = "ok" if failed == before else "FAILED"
+        print(
+            f"{name:<22} {len(frames)} frames {verdict}  "
+            f"hsv {t_hsv:6.2f} ms  bgr {t_bgr:6.2f} ms  {bgr_classes.path}"
+        )
+    sys.exit(1 if failed else 0)
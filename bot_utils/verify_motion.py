@@ -0,0 +1,103 @@
+"""
+Проверка MotionCheck на записанных кадрах: пары (до шага, после шага) с
+направлением шага, сдвиг сцены против dHash (maze_rh.THRESHOLD_BITS), который
+уже проверен на устройстве.
+
+    python bot_utils/verify_motion.py record [rounds] [--out images/motion]
+    python bot_utils/verify_motion.py images/motion
+
+record: запускать в лабиринте на открытой клетке без врагов. В каждом раунде
+шаг в каждую сторону и обратно, плюс пара без шага; кадры пишутся как
+NNN_<dir>_a.png / NNN_<dir>_b.png (dir = NE/SE/SW/NW или none).
+
+Проверка: для каждой пары - сдвиг (dx, dy), response, проекция на шаг и оба
+вердикта. Ошибки - MotionCheck подтвердил шаг там, где dHash его не видит, и
+шаг с проекцией против направления (значит, знак shift_along неверен для
+этой проекции).
+"""
+
+import glob
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, ".")
+from edges_diff import MOVED_BITS, bytes_hamming, roi_edge_signature  # noqa: E402
+from frames import FrameBundle  # noqa: E402
+from model import ALL_DIRS, Direction  # noqa: E402
+from motion import MIN_SHIFT_PX, MotionCheck, shift_along  # noqa: E402
+
+ROI = (15, 120, 1255, 415)
+
+
+def record(rounds: int, out: str) -> None:
+    from controller import Controller
+    from devices.device import Device
+
+    device = Device("127.0.0.1", 58526).connect()
+    device.open_input_session()
+    controller = Controller(device)
+    os.makedirs(out, exist_ok=True)
+
+    def pair(name: str, act) -> None:
+        cv2.imwrite(os.path.join(out, f"{name}_a.png"), controller.get_frame())
+        act()
+        time.sleep(0.5)
+        cv2.imwrite(os.path.join(out, f"{name}_b.png"), controller.get_frame())
+
+    n = 0
+    for _ in range(rounds):
+        for d in ALL_DIRS:
+            pair(f"{n:03d}_{d.label}", getattr(controller, f"move_{d.label}"))
+            n += 1
+            getattr(controller, f"move_{d.opposite.label}")()
+            time.sleep(0.5)
+        pair(f"{n:03d}_none", lambda: None)
+        n += 1
+    device.close()
+    print(f"{n} pairs in {out}")
+
+
+def check(folder: str) -> int:
+    failed = 0
+    for a_path in sorted(glob.glob(os.path.join(folder, "*_a.png"))):
+        name = os.path.basename(a_path)[: -len("_a.png")]
+        label = name.split("_")[-1]
+        a = FrameBundle(cv2.imread(a_path, cv2.IMREAD_COLOR))
+        b = FrameBundle(cv2.imread(a_path[: -len("_a.png")] + "_b.png"))
+        bits = bytes_hamming(roi_edge_signature(a, ROI), roi_edge_signature(b, ROI))
+        by_hash = bits >= MOVED_BITS
+
+        motion = MotionCheck(ROI)
+        d = Direction[label] if label in Direction.__members__ else Direction.NE
+        motion.moved(a, d)
+        by_motion = motion.moved(b, d)
+        dx, dy, response = motion.last
+        along = shift_along(dx, dy, d) if label != "none" else 0.0
+
+        errors = []
+        if by_motion and not by_hash:
+            errors.append("motion confirms a step dHash does not see")
+        if by_hash and label != "none" and along <= -MIN_SHIFT_PX:
+            errors.append("shift is against the step: sign of shift_along")
+        failed += bool(errors)
+        print(
+            f"{name:<10} shift ({dx:6.1f}, {dy:6.1f}) resp {response:.2f} "
+            f"along {along:6.1f}  motion {str(by_motion):<5} "
+            f"dHash {bits:3d} {str(by_hash):<5} {'; '.join(errors) or 'ok'}"
+        )
+    return failed
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args:
+        sys.exit(__doc__)
+    if args[0] == "record":
+        rounds = int(args[1]) if len(args) > 1 and args[1].isdigit() else 3
+        out = args[args.index("--out") + 1] if "--out" in args else "images/motion"
+        record(rounds, out)
+    else:
+        sys.exit(1 if check(args[0]) else 0)
@@ -0,0 +1,133 @@
+"""
+Проверка пирамиды find_tpl (pyramid=2) против полного матча для шаблонов,
+которые ищутся с pyramid=2: то же место и score в пределах SCORE_TOL.
+
+    python bot_utils/verify_pyramid.py [screenshots/*.png]
+
+Со скриншотами: каждый шаблон ищется на каждом кадре; сравниваются только
+кадры, где полный матч его нашёл (score >= порога вызова). Без аргументов -
+синтетические кадры 1280x720: фон из остальных картинок resources/ с шумом,
+шаблон вклеен в разные позиции, в том числе с нечётными x и y (пик грубого
+уровня тогда падает между пикселями).
+
+boss_chest (27x21, тусклый, порог 0.72) сюда не входит: на полупрозрачной
+вклейке пирамида находила его не там, где полный матч, поэтому он ищется
+без неё.
+"""
+
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, ".")
+from detect_location import _best_match  # noqa: E402
+from templates import TEMPLATES, preprocess  # noqa: E402
+
+# шаблон -> порог, с которым он ищется с pyramid=2 (controller, bot, boss/elvira)
+PYRAMID_TEMPLATES = {
+    "monetia": 0.9,
+    "black": 0.9,
+    "check_grade": 0.9,
+    "elvira_exit_ban": 0.9,
+}
+SCORE_TOL = 0.01
+POSITIONS = [(40, 30), (301, 157), (640, 361), (977, 500), (1111, 623)]
+
+
+def compare(gray, name: str, threshold: float, where: str) -> list[str]:
+    tpl = TEMPLATES[name]
+    method = cv2.TM_CCOEFF_NORMED
+    full = _best_match(gray, tpl, [1.0], method, 1, pyramid=1)
+    if full["score"] < threshold:
+        return []  # полный матч шаблона тут не видит - сравнивать нечего
+    fast = _best_match(gray, tpl, [1.0], method, 1, pyramid=2)
+    errors = []
+    if fast["loc"] != full["loc"]:
+        errors.append(f"loc {fast['loc']} != {full['loc']}")
+    if abs(fast["score"] - full["score"]) > SCORE_TOL:
+        errors.append(f"score {fast['score']:.3f} != {full['score']:.3f}")
+    print(
+        f"{name:<16} {where:<24} full {full['score']:.3f} at {full['loc']}  "
+        f"pyramid {fast['score']:.3f} at {fast['loc']}  {'; '.join(errors) or 'ok'}"
+    )
+    return errors
+
+
+def background(rng) -> np.ndarray:
+    """Кадр 1280x720 из остальных картинок resources/ поверх шума."""
+    frame = rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+    frame = cv2.GaussianBlur(frame, (0, 0), 3)
+    others = [
+        TEMPLATES[key].bgr
+        for key in sorted(TEMPLATES._templates)
+        if key not in PYRAMID_TEMPLATES
+    ]
+    for _ in range(40):
+        img = others[rng.integers(len(others))]
+        h, w = img.shape[:2]
+        if h >= 720 or w >= 1280:
+            continue
+        y, x = rng.integers(0, 720 - h), rng.integers(0, 1280 - w)
+        frame[y : y + h, x : x + w] = img
+    return frame
+
+
+def degraded(frame, bgr, xy, rng) -> dict[str, np.ndarray]:
+    """
+    Шаблон на фоне: как есть, с шумом, полупрозрачный поверх фона (эффекты
+    и подсветка в игре) и после JPEG q80 с лёгким размытием (поток minicap).
+    """
+    x, y = xy
+    h, w = bgr.shape[:2]
+    clean = frame.copy()
+    clean[y : y + h, x : x + w] = bgr
+    noise = cv2.add(clean, rng.integers(0, 6, clean.shape, dtype=np.uint8))
+    under = frame[y : y + h, x : x + w]
+    faded = {}
+    for alpha in (0.7, 0.45):
+        faded[alpha] = frame.copy()
+        faded[alpha][y : y + h, x : x + w] = cv2.addWeighted(
+            bgr, alpha, under, 1 - alpha, 0
+        )
+    jpeg = cv2.imencode(
+        ".jpg", cv2.GaussianBlur(clean, (3, 3), 0.8), [cv2.IMWRITE_JPEG_QUALITY, 80]
+    )[1]
+    return {
+        "clean": clean,
+        "noise": noise,
+        "faded 0.7": faded[0.7],
+        "faded 0.45": faded[0.45],
+        "jpeg": cv2.imdecode(jpeg, cv2.IMREAD_COLOR),
+    }
+
+
+def check_synthetic() -> int:
+    rng = np.random.default_rng(0)
+    failed = 0
+    for name, threshold in PYRAMID_TEMPLATES.items():
+        bgr = TEMPLATES[name].bgr
+        h, w = bgr.shape[:2]
+        for x, y in POSITIONS:
+            x, y = min(x, 1280 - w), min(y, 720 - h)
+            frame = background(rng)
+            for how, img in degraded(frame, bgr, (x, y), rng).items():
+                where = f"{how} at ({x}, {y})"
+                failed += bool(compare(preprocess(img), name, threshold, where))
+    return failed
+
+
+def check_screenshots(paths: list[str]) -> int:
+    failed = 0
+    for path in paths:
+        gray = preprocess(cv2.imread(path, cv2.IMREAD_COLOR))
+        for name, threshold in PYRAMID_TEMPLATES.items():
+            failed += bool(compare(gray, name, threshold, path))
+    return failed
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    failed = check_screenshots(args) if args else check_synthetic()
+    print(f"{failed} mismatches")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,124 @@
+"""
+Проверка порогов лоадера и net_error на кадре 1/2 (LOADER_THRESHOLD[2],
+NET_ERROR_THRESHOLD[2]) по записанным скриншотам.
+
+    python bot_utils/verify_scale_thresholds.py record [seconds] [--out images/loading]
+    python bot_utils/verify_scale_thresholds.py images/loading/*.png
+
+record: снимать кадры ~10 раз в секунду, пока в игре идёт загрузка или висит
+попап ошибки сети (и немного до и после - кадры без них тоже нужны).
+
+Разметку даёт полный кадр с порогами scale=1, проверенными в работе. Кадр
+1/2 получается так же, как в боте: JPEG q90 + IMREAD_REDUCED_COLOR_2 (поток
+minicap) и INTER_AREA (захват окна). Ошибка - вердикт 1/2 разошёлся с
+полным кадром; в конце - худшие score с каждой стороны порога.
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, ".")
+from detect_location import (  # noqa: E402
+    LOADER_THRESHOLD,
+    NET_ERROR_THRESHOLD,
+    crop_loader_roi,
+    find_tpl,
+)
+from devices.frame_source import _DECODE_FLAGS  # noqa: E402
+from frames import extract_game  # noqa: E402
+from templates import TEMPLATES  # noqa: E402
+
+LOADERS = [f"loader_{i}" for i in (1, 2, 3)]
+
+
+def scores(frame, scale: int) -> dict[str, float]:
+    """Лучший score лоадера и net_error на кадре 1/scale, как в LoadingWatch."""
+    loader = max(
+        find_tpl(crop_loader_roi(frame, scale), TEMPLATES[name], scale=scale)[1]
+        for name in LOADERS
+    )
+    _, net_error = find_tpl(
+        extract_game(frame, scale), TEMPLATES["net_error"], scale=scale
+    )
+    return {"loader": loader, "net_error": net_error}
+
+
+def reduced(frame) -> dict[str, np.ndarray]:
+    jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 90])[1]
+    h, w = frame.shape[:2]
+    return {
+        "jpeg": cv2.imdecode(jpeg, _DECODE_FLAGS[2]),
+        "area": cv2.resize(frame, (w // 2, h // 2), interpolation=cv2.INTER_AREA),
+    }
+
+
+def record(seconds: float, out: str) -> None:
+    from devices.device import Device
+
+    device = Device("127.0.0.1", 58526).connect()
+    os.makedirs(out, exist_ok=True)
+    t0, n = time.time(), 0
+    while time.time() - t0 < seconds:
+        cv2.imwrite(os.path.join(out, f"{n:04d}.png"), device.get_frame2())
+        n += 1
+        time.sleep(0.1)
+    device.close()
+    print(f"{n} frames in {out}")
+
+
+def check(paths: list[str]) -> int:
+    thresholds = {
+        "loader": (LOADER_THRESHOLD[1], LOADER_THRESHOLD[2]),
+        "net_error": (NET_ERROR_THRESHOLD[1], NET_ERROR_THRESHOLD[2]),
+    }
+    # худший score 1/2 среди кадров с целью и лучший - среди кадров без неё
+    worst_hit = {k: 1.0 for k in thresholds}
+    best_miss = {k: -1.0 for k in thresholds}
+    hits = {k: 0 for k in thresholds}
+    failed = 0
+    for path in paths:
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        full = scores(frame, 1)
+        for how, small in reduced(frame).items():
+            half = scores(small, 2)
+            for name, (thr1, thr2) in thresholds.items():
+                expected = full[name] >= thr1
+                got = half[name] >= thr2
+                if expected:
+                    worst_hit[name] = min(worst_hit[name], half[name])
+                else:
+                    best_miss[name] = max(best_miss[name], half[name])
+                if got != expected:
+                    failed += 1
+                    print(
+                        f"MISMATCH {path} {how} {name}: full {full[name]:.3f} "
+                        f"half {half[name]:.3f} (threshold {thr2})"
+                    )
+        for name, (thr1, _) in thresholds.items():
+            hits[name] += full[name] >= thr1
+
+    for name, (_, thr2) in thresholds.items():
+        print(
+            f"{name:<10} frames with it {hits[name]:3d}/{len(paths)}  "
+            f"1/2 threshold {thr2}: worst hit {worst_hit[name]:.3f}  "
+            f"best miss {best_miss[name]:.3f}"
+        )
+        if not hits[name]:
+            print(f"  no frames with {name}: its threshold is not checked")
+    return failed
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args:
+        sys.exit(__doc__)
+    if args[0] == "record":
+        seconds = float(args[1]) if len(args) > 1 and args[1][0].isdigit() else 20
+        out = args[args.index("--out") + 1] if "--out" in args else "images/loading"
+        record(seconds, out)
+    else:
+        sys.exit(1 if check(args) else 0)
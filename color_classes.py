@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import os
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# BGR_LUT: маски считаются прямо по BGR через таблицу на все 2^24 цвета, без
+# cvtColor в HSV. Таблицы строятся один раз и лежат в LUT_DIR.
+BGR_LUT = False
+LUT_DIR = "color_lut"
+
+Range = tuple[tuple[int, int, int], tuple[int, int, int]]
+
+
+class ColorClasses:
+    """
+    Несколько цветовых классов HSV за один проход вместо inRange на каждый
+    диапазон и OR между ними. Класс - объединение диапазонов (lo, hi), как
+    в inRange (границы включительно).
+
+    Диапазон - прямоугольник по H, S и V, поэтому таблица раскладывается на
+    три одномерные: lut[c][x] - биты диапазонов, куда попадает значение x
+    канала c. Биты пикселя - AND трёх каналов (один cv2.LUT на всё
+    изображение), маска класса - есть ли среди них биты его диапазонов.
+
+        colors = ColorClasses({"exit": [(lo1, hi1), (lo2, hi2)], "enemy": [...]})
+        colors.mask(hsv, "exit")  # == inRange(lo1, hi1) | inRange(lo2, hi2)
+
+    Маски разных классов одного кадра - один проход: frame_mask() берёт
+    биты из FrameBundle.class_bits, который считает их раз на кадр.
+    """
+
+    space = "hsv"  # какое изображение ждут bits/mask
+
+    def __init__(self, classes: dict[str, list[Range]]) -> None:
+        ranges = [r for rs in classes.values() for r in rs]
+        if len(ranges) > 16:
+            raise ValueError(f"{len(ranges)} ranges, at most 16 fit into a LUT")
+        dtype = np.uint8 if len(ranges) <= 8 else np.uint16
+        self.lut = np.zeros((256, 1, 3), dtype)
+        self.class_bits: dict[str, int] = {}
+        bit = 0
+        for name, rs in classes.items():
+            self.class_bits[name] = 0
+            for lo, hi in rs:
+                for c in range(3):
+                    self.lut[max(0, lo[c]) : min(255, hi[c]) + 1, 0, c] |= 1 << bit
+                self.class_bits[name] |= 1 << bit
+                bit += 1
+        self.classes = classes
+
+    def bits(self, hsv: cv2.typing.MatLike) -> np.ndarray:
+        """Биты диапазонов для каждого пикселя."""
+        return self._hsv_bits(hsv)
+
+    def _hsv_bits(self, hsv: cv2.typing.MatLike) -> np.ndarray:
+        h, s, v = cv2.split(cv2.LUT(hsv, self.lut))
+        return cv2.bitwise_and(cv2.bitwise_and(h, s), v)
+
+    def _mask(self, bits: np.ndarray, name: str) -> cv2.typing.MatLike:
+        hit = cv2.bitwise_and(bits, self.class_bits[name])
+        return cv2.compare(hit, 0, cv2.CMP_GT)
+
+    def mask(self, hsv: cv2.typing.MatLike, name: str) -> cv2.typing.MatLike:
+        """Маска класса name (uint8 0/255), как OR его inRange."""
+        return self._mask(self.bits(hsv), name)
+
+    def masks(self, hsv: cv2.typing.MatLike) -> dict[str, cv2.typing.MatLike]:
+        bits = self.bits(hsv)
+        return {name: self._mask(bits, name) for name in self.class_bits}
+
+    def frame_mask(self, frame, name: str, part: str = "game") -> cv2.typing.MatLike:
+        """Маска класса name по части part ("game" / "minimap") FrameBundle."""
+        return self._mask(frame.class_bits(self, part), name)
+
+    def contains(self, name: str, hsv_value) -> bool:
+        """Попадает ли цвет hsv_value = (h, s, v) в класс name."""
+        b = self.class_bits[name]
+        for c, x in enumerate(hsv_value):
+            b &= int(self.lut[x, 0, c])
+        return b != 0
+
+
+class BgrColorClasses(ColorClasses):
+    """
+    Те же классы, что у ColorClasses, но по BGR: table[цвет BGR] - биты
+    диапазонов его HSV, посчитанные cv2.cvtColor для всех 2^24 цветов, так
+    что маски совпадают с inRange по HSV бит в бит. Маска кадра - одна
+    выборка из таблицы (16 МБ, до 8 диапазонов; 32 МБ - до 16).
+
+    Таблица строится ~1 с и сохраняется в LUT_DIR под хешем диапазонов;
+    дальше открывается через mmap, в память попадают только нужные цвета.
+    """
+
+    space = "bgr"
+
+    def __init__(self, classes: dict[str, list[Range]], lut_dir=LUT_DIR) -> None:
+        super().__init__(classes)
+        # биты идут в порядке классов и диапазонов - он входит в ключ
+        key = repr([(k, [tuple(map(tuple, r)) for r in v]) for k, v in classes.items()])
+        digest = hashlib.sha1(f"{key} {cv2.__version__}".encode()).hexdigest()[:16]
+        self.path = os.path.join(lut_dir, f"bgr_{digest}.npy")
+        self.table = self._load()
+
+    def _load(self) -> np.ndarray:
+        if not os.path.exists(self.path):
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp.npy"
+            np.save(tmp, self.build_table())
+            os.replace(tmp, self.path)
+            logger.debug(f"BGR color table saved to {self.path}")
+        return np.load(self.path, mmap_mode="r")
+
+    def build_table(self) -> np.ndarray:
+        """Биты HSV-диапазонов для каждого цвета; индекс - B | G << 8 | R << 16."""
+        idx = np.arange(1 << 24, dtype=np.uint32).reshape(4096, 4096)
+        bgr = np.empty((4096, 4096, 3), np.uint8)
+        for c in range(3):
+            bgr[..., c] = (idx >> (8 * c)) & 255
+        hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+        return self._hsv_bits(hsv).ravel()
+
+    def bits(self, bgr: cv2.typing.MatLike) -> np.ndarray:
+        # BGRA little-endian как uint32 = B | G << 8 | R << 16 | A << 24
+        bgra = cv2.cvtColor(bgr, cv2.COLOR_BGR2BGRA)
+        bgra[..., 3] = 0
+        return np.take(self.table, bgra.view(np.uint32)[..., 0])
+
+
+def color_classes(classes: dict[str, list[Range]], bgr: bool | None = None):
+    """ColorClasses или BgrColorClasses (bgr=None - по флагу BGR_LUT)."""
+    if BGR_LUT if bgr is None else bgr:
+        return BgrColorClasses(classes)
+    return ColorClasses(classes)
@@ -1,106 +1,154 @@
 import logging
 import time
+from concurrent.futures import Future
+
 import cv2
 
 from detect_location import find_tpl, wait_for, wait_loading
+from delay_profile import CONTROLLER_DELAYS, load_delay_profile
 from devices.device import Device
+from input_queue import InputQueue
+from macro import Macro, MacroRun
+from templates import TEMPLATES
 
 logger = logging.getLogger(__name__)
 
 
 class Controller:
     _delay = 0.170  # Default delay between movements
+    skill_delay = 0.1  # skill button -> target tap
+    attack_delay = 0.2
+    back_delay = 0.2  # back -> dialog is up
     skill_1_point = (920, 600)
     skill_1_point_cancel = (930, 510)
     skill_2_point = (1020, 600)
     skill_3_point = (1120, 600)
     skill_4_point = (1220, 600)
-
-    def __init__(self, device: Device, debug=False):
+    # movement pad
+    move_points = {
+        "W": (115, 500),
+        "E": (315, 500),
+        "N": (220, 425),
+        "S": (220, 580),
+        "NW": (170, 460),
+        "NE": (270, 460),
+        "SW": (170, 540),
+        "SE": (270, 540),
+    }
+
+    def __init__(self, device: Device, debug=False, async_input=False):
         self.device: Device = device
         self.debug = debug
         self.use_click = False
+        # паузы, подобранные под эту машину (bot_utils/calibrate_delays.py)
+        self.delay_profile = load_delay_profile()
+        for action, attr in CONTROLLER_DELAYS.items():
+            if action in self.delay_profile:
+                setattr(self, attr, self.delay_profile[action])
+        # async_input: ввод уходит через очередь, методы не блокируют поток
+        self.input_queue: InputQueue | None = InputQueue() if async_input else None
+
+    def _send(self, fn, *args, after=0.0) -> Future | None:
+        """Выполнить ввод и выдержать паузу after - сразу или через очередь."""
+        if self.input_queue is not None:
+            return self.input_queue.submit(fn, *args, after=after)
+        fn(*args)
+        if after > 0:
+            time.sleep(after)
+        return None
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Дождаться, пока весь поставленный в очередь ввод отработает."""
+        if self.input_queue is not None:
+            self.input_queue.flush(timeout)
+
+    def get_frame(self, scale: int = 1) -> cv2.typing.MatLike:
+        """Кадр, снятый уже после всего поставленного в очередь ввода."""
+        self.flush()
+        return self.device.get_frame2(scale)
+
+    def press(self, x, y, time_ms=_delay, after=0.0):
+        return self._send(
+            self.device.input, f"input swipe {x} {y} {x} {y} {time_ms}", after=after
+        )
 
-    def press(self, x, y, time_ms=_delay):
-        self.device.device.shell(f"input swipe {x} {y} {x} {y} {time_ms}")
+    def _move(self, direction: str, cell: int) -> Future | None:
+        future = None
+        for _ in range(cell):
+            future = self._tap(self.move_points[direction], after=self._delay)
+        return future
+
+    def settle(self, seconds: float) -> Future | None:
+        """
+        Пауза после шага, пока персонаж доходит до клетки. seconds подобраны
+        под шаг в Controller._delay; с откалиброванным шагом пауза меняется
+        в той же пропорции, что и он, без профиля остаётся как есть.
+        """
+        if "move" in self.delay_profile:
+            seconds *= self.delay_profile["move"] / Controller._delay
+        return self._send(time.sleep, seconds)
 
     def move_W(self, cell=1):
-        for _ in range(cell):
-            self._tap((115, 500))
-            time.sleep(self._delay)
+        return self._move("W", cell)
 
     def move_E(self, cell=1):
-        for _ in range(cell):
-            self._tap((315, 500))
-            time.sleep(self._delay)
+        return self._move("E", cell)
 
     def move_N(self, cell=1):
-        for _ in range(cell):
-            self._tap((220, 425))
-            time.sleep(self._delay)
+        return self._move("N", cell)
 
     def move_S(self, cell=1):
-        for _ in range(cell):
-            self._tap((220, 580))
-            time.sleep(self._delay)
+        return self._move("S", cell)
 
     # Diagonal movements
     # ↖
     def move_NW(self, cell=1):
-        for _ in range(cell):
-            self._tap((170, 460))
-            time.sleep(self._delay)
+        return self._move("NW", cell)
 
     # ↗
     def move_NE(self, cell=1):
-        for _ in range(cell):
-            self._tap((270, 460))
-            time.sleep(self._delay)
+        return self._move("NE", cell)
 
     # ↙
     def move_SW(self, cell=1):
-        for _ in range(cell):
-            self._tap((170, 540))
-            time.sleep(self._delay)
+        return self._move("SW", cell)
 
     # ↘
     def move_SE(self, cell=1):
-        for _ in range(cell):
-            self._tap((270, 540))
-            time.sleep(self._delay)
+        return self._move("SE", cell)
 
     def skill_1(self, p: cv2.typing.Point | None = None):
-        self._tap(self.skill_1_point)
-        time.sleep(0.1)
-        self._tap(self.skill_1_point if p is None else p)
+        self._tap(self.skill_1_point, after=self.skill_delay)
+        return self._tap(self.skill_1_point if p is None else p)
 
     def skill_2(self, p: cv2.typing.Point | None = None):
-        self._tap(self.skill_2_point)
-        time.sleep(0.1)
-        self._tap(self.skill_2_point if p is None else p)
+        self._tap(self.skill_2_point, after=self.skill_delay)
+        return self._tap(self.skill_2_point if p is None else p)
 
     def skill_3(self, p: cv2.typing.Point | None = None):
-        self._tap(self.skill_3_point)
-        time.sleep(0.1)
-        self._tap(self.skill_3_point if p is None else p)
+        self._tap(self.skill_3_point, after=self.skill_delay)
+        return self._tap(self.skill_3_point if p is None else p)
 
     def skill_4(self, p: cv2.typing.Point | None = None):
-        self.click(self.skill_4_point)
-        time.sleep(0.1)
-        self.click(self.skill_4_point if p is None else p)
+        self.click(self.skill_4_point, after=self.skill_delay)
+        return self.click(self.skill_4_point if p is None else p)
 
-    def _tap(self, xy: cv2.typing.Point):
+    def _tap(self, xy: cv2.typing.Point, after=0.0):
         if self.use_click:
-            self.click(xy)
-        else:
-            self.device.device.shell(f"input tap {xy[0]} {xy[1]}", decode=False)
+            return self.click(xy, after=after)
+        return self._send(self.device.input, f"input tap {xy[0]} {xy[1]}", after=after)
+
+    def click(self, xy: cv2.typing.Point, after=0.0):
+        return self._send(self.device.click, xy, after=after)
 
-    def click(self, xy: cv2.typing.Point):
-        self.device.click(xy)
+    def run_macro(self, macro: Macro) -> MacroRun:
+        """Запустить макрос целиком и сразу вернуть управление."""
+        self.flush()  # макрос не должен обогнать ввод из очереди
+        return MacroRun(self, macro)
 
     # Back button
     def back(self):
-        return self.device.device.shell("input keyevent 4")
+        return self._send(self.device.input, "input keyevent 4")
 
     def yes(self):
         return self._tap((740, 500))
@@ -108,40 +156,44 @@ class Controller:
     def confirm(self):
         return self._tap((740, 530))
 
-    def attack(self, target: cv2.typing.Point | None = None) -> None:
+    def attack(self, target: cv2.typing.Point | None = None):
         if target is not None:
-            self._tap(target)
-            time.sleep(0.1)
-        self.device.device.shell("input tap 1100 450", decode=False)
-        time.sleep(0.2)
+            self._tap(target, after=0.1)
+        return self._send(
+            self.device.input, "input tap 1100 450", after=self.attack_delay
+        )
 
-    def wait_loading(self, wait_appearance=0.5, timeout=1):
+    def wait_loading(self, wait_appearance=0.5, timeout=1, scale=1):
+        # scale=2 - только после bot_utils/verify_scale_thresholds.py на своих кадрах
         wait_loading(
-            self.device.get_frame2,
+            lambda: self.get_frame(scale),
             wait_appearance=wait_appearance,
             timeout=timeout,
             retry=self.yes,
+            scale=scale,
         )
 
     def full_back(self, close_game=False):
         def get_frame():
-            return self.device.get_frame2()
+            return self.get_frame()
 
         exit = "resources/exit.png"
-        monetia = cv2.imread("resources/monetia.png", cv2.IMREAD_COLOR)
-        monetia_box, _ = find_tpl(get_frame(), monetia, debug=self.debug)
+        monetia = TEMPLATES["monetia"]
+        monetia_box, _ = find_tpl(get_frame(), monetia, debug=self.debug, pyramid=2)
         while monetia_box is None:
             self.back()
             if wait_for(exit, get_frame, 1, debug=self.debug):
                 self.yes()
             if wait_loading(get_frame, 3, debug=self.debug):
                 time.sleep(3)
-            monetia_box, _ = find_tpl(get_frame(), monetia, debug=self.debug)
+            monetia_box, _ = find_tpl(get_frame(), monetia, debug=self.debug, pyramid=2)
 
     def flush_bag(self, decompose=True) -> bool:
         logger.debug("flush bag")
-        black = cv2.imread("resources/black.png", cv2.IMREAD_COLOR)
-        black_box, _ = find_tpl(self.device.get_frame2(), black, score_threshold=0.9)
+        black = TEMPLATES["black"]
+        black_box, _ = find_tpl(
+            self.get_frame(), black, score_threshold=0.9, pyramid=2
+        )
         if black_box is None:
             logger.debug("failed to flush bag")
             return False
@@ -163,18 +215,16 @@ class Controller:
         # Decompose routine
         if decompose:
             logger.debug("decompose items")
-            self._tap((1060, 320))  # Decompose button
-            time.sleep(1)
+            select = Macro().tap((1060, 320), 1)  # Decompose button
             for x in range(680, 1081, 100):
-                self._tap((x, 450))  # Select Items
-                time.sleep(0.05)
-
-            self._tap((1140, 360))  # Decompose action button
-            time.sleep(0.5)
+                select.tap((x, 450), 0.05)  # Select Items
+            select.tap((1140, 360), 0.5)  # Decompose action button
+            self.run_macro(select).wait()
             check_box, _ = find_tpl(
-                self.device.get_frame2(),
-                cv2.imread("resources/check_grade.png", cv2.IMREAD_COLOR),
+                self.get_frame(),
+                TEMPLATES["check_grade"],
                 score_threshold=0.9,
+                pyramid=2,
             )
             if check_box is not None:
                 self._tap((740, 500))  # Confirm button
@@ -186,19 +236,17 @@ class Controller:
 
         # Trade routine
         logger.debug("trade items")
-        self._tap((1060, 390))  # Trade button
-        time.sleep(0.5)
-        self._tap((700, 380))  # Equip tab
-        time.sleep(0.5)
-        self._tap((1170, 375))  # Sell button
-        time.sleep(0.5)
-        self._tap((1150, 115))  # Sell the grade button
-        time.sleep(0.5)
-        self._tap((400, 260))  # Increase grade button
-        time.sleep(0.05)
-        self._tap((400, 260))  # Increase grade button
-        time.sleep(0.05)
-        self._tap((850, 490))  # OK button
+        trade = (
+            Macro()
+            .tap((1060, 390), 0.5)  # Trade button
+            .tap((700, 380), 0.5)  # Equip tab
+            .tap((1170, 375), 0.5)  # Sell button
+            .tap((1150, 115), 0.5)  # Sell the grade button
+            .tap((400, 260), 0.05)  # Increase grade button
+            .tap((400, 260), 0.05)  # Increase grade button
+            .tap((850, 490))  # OK button
+        )
+        self.run_macro(trade).wait()
         self.wait_loading(2)
 
         return True
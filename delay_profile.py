@@ -0,0 +1,42 @@
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# пишет bot_utils/calibrate_delays.py; у каждой машины свой
+DELAY_PROFILE = "delay_profile.json"
+
+# действие -> атрибут Controller с паузой после него
+CONTROLLER_DELAYS = {
+    "move": "_delay",
+    "skill": "skill_delay",
+    "attack": "attack_delay",
+    "back": "back_delay",
+}
+
+
+def load_delay_profile(path: str = DELAY_PROFILE) -> dict[str, float]:
+    """
+    Паузы, подобранные калибровкой: {"move": 0.14, "skill": 0.08, ...}.
+    Нет файла или он битый - пустой словарь, остаются константы из кода.
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return {k: float(v) for k, v in data["delays"].items()}
+    except Exception as e:
+        logger.warning(f"Ignoring delay profile {path}: {e}")
+        return {}
+
+
+def save_delay_profile(
+    delays: dict[str, float], stats: dict | None = None, path: str = DELAY_PROFILE
+) -> None:
+    data = {"delays": {k: round(v, 3) for k, v in delays.items()}}
+    if stats:
+        data["stats"] = stats
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
@@ -1,17 +1,38 @@
 import cv2
 import numpy as np
-import time
 
+from color_classes import ColorClasses
 from devices.device import Device
+from waiter import WaitCondition, wait_any
 
 _boss_label = np.load("resources/boss_label_eroded.npy")
 
+# масштаб кадра -> (ядро закрытия маски, допуск совпадения)
+# на 1/2 контур надписи теряет до ~2% пикселей в зависимости от фазы
+_BOSS_LABEL_PARAMS = {1: (5, 0.0), 2: (3, 0.05)}
+_boss_labels = {1: _boss_label}
 
-def _mask_red(hsv):
-    m1 = cv2.inRange(hsv, (0, 120, 130), (10, 255, 255))
-    m2 = cv2.inRange(hsv, (170, 120, 130), (180, 255, 255))
-    m = cv2.bitwise_or(m1, m2)
-    m = cv2.morphologyEx(m, cv2.MORPH_CLOSE, np.ones((5, 5), np.uint8))
+
+def _boss_label_at(scale):
+    """Шаблон надписи, ужатый под кадр 1/scale (считается один раз)."""
+    label = _boss_labels.get(scale)
+    if label is None:
+        h, w = _boss_label.shape[:2]
+        label = cv2.resize(
+            _boss_label, (w // scale, h // scale), interpolation=cv2.INTER_AREA
+        )
+        _boss_labels[scale] = label
+    return label
+
+
+_RED = ColorClasses(
+    {"red": [((0, 120, 130), (10, 255, 255)), ((170, 120, 130), (180, 255, 255))]}
+)
+
+
+def _mask_red(hsv, close_k=5):
+    m = _RED.mask(hsv, "red")
+    m = cv2.morphologyEx(m, cv2.MORPH_CLOSE, np.ones((close_k, close_k), np.uint8))
     return m
 
 
@@ -56,26 +77,34 @@ def _find_mask_tm(big_mask, small_mask, tolerance=0.0, debug=False):
     return hits, res
 
 
-def wait_for_boss_popup(get_frame, timeout_s=8, debug=False):
+def boss_popup_condition(scale=1) -> WaitCondition:
+    """Условие для wait_any: доля пикселей надписи, найденных в красной маске."""
+    if scale not in _BOSS_LABEL_PARAMS:
+        raise ValueError(
+            f"unsupported scale {scale}, expected one of {tuple(_BOSS_LABEL_PARAMS)}"
+        )
+    close_k, tolerance = _BOSS_LABEL_PARAMS[scale]
+    label = _boss_label_at(scale)
+    target = float(_mask01(label).sum())
+
+    def score(frame: cv2.typing.MatLike) -> float:
+        mask = _mask_red(cv2.cvtColor(frame, cv2.COLOR_BGR2HSV), close_k)
+        _, res = _find_mask_tm(mask, label, tolerance, debug=False)
+        return float(res.max()) / target
+
+    # без баннера в красной маске набирается от силы половина надписи
+    return WaitCondition("boss_popup", score, 1.0 - tolerance, floor=0.5)
+
+
+def wait_for_boss_popup(get_frame, timeout_s=8, debug=False, scale=1, get_seq=None):
     """
-    get_frame() -> BGR кадр (np.ndarray).
+    get_frame() -> BGR кадр (np.ndarray), уменьшенный в scale раз (1 или 2).
     Ждём появления баннера до timeout_s. Возвращаем True/False.
     """
-    t0 = time.time()
-    while time.time() - t0 < timeout_s:
-        frame = get_frame()
-        if frame is None:
-            time.sleep(0.02)
-            continue
-
-        mask = _mask_red(cv2.cvtColor(frame, cv2.COLOR_BGR2HSV))
-        hits, _ = _find_mask_tm(mask, _boss_label, debug=False)
-        if len(hits) > 0:
-            print(f"Boss popup detected t={time.time() - t0:.1f}s") if debug else None
-            return True
-
-        time.sleep(0.1)
-    return False
+    found, _ = wait_any(
+        get_frame, [boss_popup_condition(scale)], timeout_s, get_seq, debug=debug
+    )
+    return found is not None
 
 
 if __name__ == "__main__":
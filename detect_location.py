@@ -1,69 +1,120 @@
+import logging
 import time
+from enum import Enum
 
 import cv2
 import numpy as np
 
-from frames import extract_game
-
-
-def preprocess(img_bgr):
-    # Упор на форму светлой ленты: серый + лёгкое сглаживание + контраст
-    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    # cv2.imshow("g", gray)
-    # cv2.waitKey(0)
-    return gray
-
+from frames import FrameGate, crop, extract_game
+from templates import TEMPLATES, Template, preprocess
+from waiter import WaitCondition, wait_any
+
+# Пороги по масштабу кадра. Лоадеры ~12x11, после ужатия вдвое совпадение
+# зависит от фазы пикселей: худший случай на синтетике 0.81 (net_error 0.80),
+# поэтому мельче 1/2 их не ищем. Пороги 1/2 на записанных кадрах проверяет
+# bot_utils/verify_scale_thresholds.py; по умолчанию везде scale=1.
+LOADER_THRESHOLD = {1: 0.95, 2: 0.78}
+NET_ERROR_THRESHOLD = {1: 0.9, 2: 0.75}
+
+logger = logging.getLogger(__name__)
+
+
+def crop_loader_roi(frame: cv2.typing.MatLike, scale: int = 1) -> cv2.typing.MatLike:
+    return crop(frame, "loader", scale=scale)
+
+
+# Пирамида: поиск пиков на кадре, ужатом в pyramid раз, и уточнение в полном
+# разрешении только вокруг PYRAMID_TOP_K лучших из них. Шаблон, у которого на
+# грубом уровне сторона меньше PYRAMID_MIN_SIDE, ищется обычным полным матчем.
+PYRAMID_TOP_K = 3
+PYRAMID_MIN_SIDE = 8
+
+
+def _pyramid_peak(img_p, tpl_p, coarse, tpl_c, level, method):
+    """Лучшее (score, loc) полного матча в окнах вокруг пиков грубого."""
+    res = cv2.matchTemplate(coarse, tpl_c, method)
+    h, w = tpl_p.shape[:2]
+    hc, wc = tpl_c.shape[:2]
+    H, W = img_p.shape[:2]
+    pad = 2 * level  # пик грубого уровня смещён не больше чем на пару пикселей
+    best_score, best_loc = -1.0, (0, 0)
+    for _ in range(PYRAMID_TOP_K):
+        _, peak, _, (px, py) = cv2.minMaxLoc(res)
+        if peak <= -1:
+            break
+        x0, y0 = max(0, px * level - pad), max(0, py * level - pad)
+        x1, y1 = min(W, px * level + w + pad), min(H, py * level + h + pad)
+        if x1 - x0 >= w and y1 - y0 >= h:
+            fine = cv2.matchTemplate(img_p[y0:y1, x0:x1], tpl_p, method)
+            _, score, _, (lx, ly) = cv2.minMaxLoc(fine)
+            if score > best_score:
+                best_score, best_loc = score, (x0 + lx, y0 + ly)
+        # погасить окрестность пика, чтобы следующий был другим кандидатом
+        ry, rx = max(0, py - hc // 2), max(0, px - wc // 2)
+        res[ry : py + hc // 2 + 1, rx : px + wc // 2 + 1] = -1
+    return best_score, best_loc
+
+
+def _best_match(img_p, tpl: Template, scales, method, scale, pyramid=1) -> dict:
+    best = dict(score=-1, rect=None, scale=None, loc=None)
+    coarse = None
+    if pyramid > 1 and method in (cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED):
+        H, W = img_p.shape[:2]
+        size = (-(-W // pyramid), -(-H // pyramid))
+        coarse = cv2.resize(img_p, size, interpolation=cv2.INTER_AREA)
 
-def crop_loader_roi(frame: cv2.typing.MatLike) -> cv2.typing.MatLike:
-    X = 550
-    Y = 600
-    W = 200
-    H = 40
-    return cv2.resize(frame[Y : Y + H, X : X + W], (W, H))
+    for s in scales:
+        tpl_p = tpl.resized(s, scale)
+        h, w = tpl_p.shape[:2]
+        if h > img_p.shape[0] or w > img_p.shape[1]:
+            continue  # окно поиска меньше шаблона этого масштаба
+
+        if coarse is not None and min(h, w) >= PYRAMID_MIN_SIDE * pyramid:
+            tpl_c = tpl.resized(s, scale * pyramid)
+            score, max_loc = _pyramid_peak(img_p, tpl_p, coarse, tpl_c, pyramid, method)
+        else:
+            res = cv2.matchTemplate(img_p, tpl_p, method)
+            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
+            score = (
+                max_val
+                if method in (cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED)
+                else -min_val
+            )
+        if score > best["score"]:
+            best.update(
+                score=score, rect=(max_loc[0], max_loc[1], w, h), scale=s, loc=max_loc
+            )
+    return best
 
 
 def find_tpl(
     frame: cv2.typing.MatLike,
-    tpl: cv2.typing.MatLike,  # IMREAD_COLOR
+    tpl: cv2.typing.MatLike | Template,  # IMREAD_COLOR или из TEMPLATES
     scales=[1.0],  # np.linspace(1.0, 1.0, 3)
     method=cv2.TM_CCOEFF_NORMED,
     score_threshold=0.9,
     debug=False,
+    scale=1,  # frame is reduced to 1/scale (Device.get_frame2(scale))
+    pyramid=1,  # 2 или 4: грубый поиск на ужатом кадре, см. _pyramid_peak
 ):
+    """
+    tpl - всегда полноразмерный шаблон: для уменьшенного кадра он ужимается
+    тем же INTER_AREA, а найденная рамка возвращается в координатах полного кадра.
+    Template из TEMPLATES приносит уже готовые серые копии нужного размера
+    и окно поиска (templates.SEARCH_WINDOWS): сначала матч только в нём.
+    """
     img_p = preprocess(frame)
-    tpl_p0 = preprocess(tpl)
-
-    best = dict(score=-1, rect=None, scale=None, loc=None)
-    for s in scales:
-        w = max(1, int(tpl_p0.shape[1] * s))
-        h = max(1, int(tpl_p0.shape[0] * s))
-        tpl_p = cv2.resize(tpl_p0, (w, h), interpolation=cv2.INTER_AREA)
-
-        res = cv2.matchTemplate(img_p, tpl_p, method)
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
-        score = (
-            max_val
-            if method in (cv2.TM_CCOEFF_NORMED, cv2.TM_CCORR_NORMED)
-            else -min_val
-        )
-        if score > best["score"]:
-            best.update(
-                score=score, rect=(max_loc[0], max_loc[1], w, h), scale=s, loc=max_loc
-            )
-
-    if best["score"] < score_threshold:
-        return None, best["score"]
-
-    x, y, w, h = best["rect"]
-    cx, cy = x + w // 2, y + h // 2
+    box, score = _locate(img_p, tpl, scales, method, score_threshold, scale, pyramid)
 
-    if debug:
+    if debug and box is not None:
+        x, y, w, h = (v // scale for v in (box["x"], box["y"], box["w"], box["h"]))
+        cx, cy = x + w // 2, y + h // 2
         out = frame.copy()
         cv2.rectangle(out, (x, y), (x + w, y + h), (0, 255, 0), 2)
         cv2.circle(out, (cx, cy), 3, (0, 0, 255), -1)
         cv2.putText(
             out,
-            f"score={best['score']:.2f}, scale={best['scale']:.2f}",
+            f"score={box['score']:.2f}, scale={box['scale']:.2f}",
             (max(0, x - 20), max(20, y - 10)),
             cv2.FONT_HERSHEY_SIMPLEX,
             0.5,
@@ -73,6 +124,77 @@ def find_tpl(
         cv2.imshow("DBG/find_tpl", out)
         cv2.waitKey(1)
 
+    return box, score
+
+
+def match_many(
+    frame: cv2.typing.MatLike,
+    tpls: list,
+    score_threshold: float | list[float] = 0.9,
+    mode: str = "all",  # "all" | "any"
+    scales=[1.0],
+    method=cv2.TM_CCOEFF_NORMED,
+    debug=False,
+    scale=1,
+    pyramid=1,
+) -> list[tuple[dict | None, float | None]]:
+    """
+    Несколько шаблонов по одному кадру: preprocess кадра один раз, дальше
+    каждый шаблон ищется по общему серому буферу. Результат - (box, score)
+    на каждый шаблон, как у find_tpl. mode="any" - остановиться на первом
+    совпадении, у непроверенных шаблонов (None, None).
+
+        hits = match_many(roi, [loader_1, loader_2, loader_3], 0.95, "any")
+        found = any(box is not None for box, _ in hits)
+    """
+    img_p = preprocess(frame)
+    if not isinstance(score_threshold, (list, tuple)):
+        score_threshold = [score_threshold] * len(tpls)
+
+    results: list[tuple[dict | None, float | None]] = [(None, None)] * len(tpls)
+    for i, (tpl, thr) in enumerate(zip(tpls, score_threshold)):
+        results[i] = _locate(img_p, tpl, scales, method, thr, scale, pyramid)
+        if mode == "any" and results[i][0] is not None:
+            break
+
+    if debug:
+        out = frame.copy()
+        for box, _ in results:
+            if box is not None:
+                x, y = box["x"] // scale, box["y"] // scale
+                w, h = box["w"] // scale, box["h"] // scale
+                cv2.rectangle(out, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        cv2.imshow("DBG/match_many", out)
+        cv2.waitKey(1)
+    return results
+
+
+def _locate(img_p, tpl, scales, method, score_threshold, scale, pyramid=1):
+    """find_tpl по уже подготовленному (серому) кадру, без отладки."""
+    if not isinstance(tpl, Template):
+        tpl = Template("", tpl)
+
+    best = None
+    window = tpl.search_window(img_p.shape, scale)
+    if window is not None:
+        x0, y0, x1, y1 = window
+        best = _best_match(img_p[y0:y1, x0:x1], tpl, scales, method, scale)
+        if best["score"] >= score_threshold:
+            x, y, w, h = best["rect"]
+            best["rect"] = (x + x0, y + y0, w, h)
+        else:
+            best = None  # в окне нет - ищем по всему кадру
+    if best is None:
+        best = _best_match(img_p, tpl, scales, method, scale, pyramid)
+
+    if best["score"] < score_threshold:
+        return None, best["score"]
+
+    x, y, w, h = best["rect"]
+    x, y, w, h = x * scale, y * scale, w * scale, h * scale
+    cx, cy = x + w // 2, y + h // 2
+    tpl.remember_hit(img_p.shape, scale, (x, y, w, h))
+
     # Возвращаем координаты прямоугольника и центра
     return {
         "x": x,
@@ -86,81 +208,186 @@ def find_tpl(
     }, best["score"]
 
 
+def tpl_condition(
+    name: str, tpl, threshold=0.9, scale=1, crop=None, debug=False
+) -> WaitCondition:
+    """Условие для wait_any: шаблон на кадре; crop(frame) - ROI поиска."""
+
+    def score(frame: cv2.typing.MatLike) -> float:
+        roi = frame if crop is None else crop(frame)
+        _, s = find_tpl(roi, tpl, score_threshold=threshold, debug=debug, scale=scale)
+        return s
+
+    return WaitCondition(name, score, threshold)
+
+
 def wait_for(
     tpl_path: str | cv2.typing.MatLike,
     get_frame,
     timeout_s=8,
     score_threshold=0.9,
     debug=False,
+    scale=1,
+    get_seq=None,
 ):
     """
-    get_frame() -> BGR кадр (np.ndarray).
+    get_frame() -> BGR кадр (np.ndarray), уменьшенный в scale раз.
     Ждём появления баннера до timeout_s. Возвращаем True/False.
+    get_seq() - номер кадра источника (Device.frame_seq), если он есть.
     """
     if type(tpl_path) is str:
-        tpl = cv2.imread(str(tpl_path), cv2.IMREAD_COLOR)
+        tpl, name = TEMPLATES[tpl_path], tpl_path
     else:
-        tpl = tpl_path
+        tpl, name = tpl_path, "template"
 
-    t0 = time.time()
-    while time.time() - t0 < timeout_s:
-        frame = get_frame()
-        if frame is None:
-            time.sleep(0.02)
-            continue
+    cond = tpl_condition(name, tpl, score_threshold, scale, debug=debug)
+    found, _ = wait_any(get_frame, [cond], timeout_s, get_seq, debug=debug)
+    return found is not None
 
-        box, _ = find_tpl(frame, tpl, score_threshold=score_threshold, debug=debug)
-        if box is not None:
-            print(f"{tpl_path} detected t={time.time() - t0:.1f}s") if debug else None
-            return True
 
-        time.sleep(0.1)
-    return False
+class LoadingState(Enum):
+    WAIT_APPEAR = "wait_appear"  # ждём, когда покажется лоадер
+    LOADING = "loading"  # лоадер на экране
+    NET_ERROR = "net_error"  # попап ошибки сети
+    RETRY = "retry"  # жмём retry и ждём лоадер заново
+    DONE = "done"  # лоадер пропал
+    FAILED = "failed"  # лоадер не появился / не пропал за отведённое время
+
 
+class LoadingWatch:
+    """
+    wait_loading без рекурсии: один классификатор на кадр (net_error /
+    loader / ничего) и переходы WAIT_APPEAR -> LOADING -> DONE, из любого
+    ожидания - NET_ERROR -> RETRY -> WAIT_APPEAR. retry() жмётся один раз на
+    показ попапа: RETRY ждёт, пока он уйдёт, или retry_timeout. У WAIT_APPEAR,
+    LOADING и RETRY свой бюджет времени; events - [(time.time(), из, в)].
+    """
 
-def wait_loading(get_frame, wait_appearance=3, timeout=30, retry=None, debug=False):
+    def __init__(
+        self,
+        get_frame,
+        wait_appearance=3,
+        timeout=30,
+        retry=None,
+        debug=False,
+        scale=1,
+        max_retries=5,
+        on_event=None,  # on_event(t, from_state, to_state)
+        retry_timeout=5,
+    ) -> None:
+        if scale not in LOADER_THRESHOLD:
+            raise ValueError(
+                f"unsupported scale {scale}, expected one of {tuple(LOADER_THRESHOLD)}"
+            )
+        self.get_frame = get_frame
+        self.budget = {
+            LoadingState.WAIT_APPEAR: wait_appearance,
+            LoadingState.LOADING: timeout,
+            LoadingState.RETRY: retry_timeout,  # ждём, пока попап уйдёт после тапа
+        }
+        self.retry = retry
+        self.debug = debug
+        self.scale = scale
+        self.max_retries = max_retries
+        self.on_event = on_event
+        self.retries = 0
+        self.state: LoadingState | None = None
+        self.entered = 0.0
+        self.events: list[tuple[float, LoadingState | None, LoadingState]] = []
+        self._loaders = [TEMPLATES[f"loader_{i}"] for i in (1, 2, 3)]
+        self._net_error = TEMPLATES["net_error"]
+
+    def classify(self, frame: cv2.typing.MatLike) -> LoadingState:
+        """NET_ERROR, LOADING (виден лоадер) или DONE (ни того ни другого)."""
+        box, _ = find_tpl(
+            extract_game(frame, self.scale),
+            self._net_error,
+            score_threshold=NET_ERROR_THRESHOLD[self.scale],
+            scale=self.scale,
+        )
+        if box is not None:
+            return LoadingState.NET_ERROR
+        hits = match_many(
+            crop_loader_roi(frame, self.scale),
+            self._loaders,
+            LOADER_THRESHOLD[self.scale],
+            "any",
+            debug=self.debug,
+            scale=self.scale,
+        )
+        if any(box is not None for box, _ in hits):
+            return LoadingState.LOADING
+        return LoadingState.DONE
+
+    def _enter(self, state: LoadingState) -> None:
+        now = time.time()
+        if self.state is not None and self.debug:
+            spent = now - self.entered
+            print(f"{self.state.value} -> {state.value} after {spent:.2f}s")
+        self.events.append((now, self.state, state))
+        if self.on_event is not None:
+            self.on_event(now, self.state, state)
+        self.state, self.entered = state, now
+
+    def durations(self) -> dict[str, float]:
+        """Сколько секунд провели в каждом состоянии (за все заходы)."""
+        out: dict[str, float] = {}
+        for (t0, _, state), (t1, _, _) in zip(self.events, self.events[1:]):
+            out[state.value] = out.get(state.value, 0.0) + t1 - t0
+        return out
+
+    def run(self) -> bool:
+        gate = FrameGate()
+        seen = LoadingState.DONE  # класс последнего отличающегося кадра
+        self._enter(LoadingState.WAIT_APPEAR)
+        while True:
+            frame = self.get_frame()
+            if gate.is_new(frame):
+                seen = self.classify(frame)
+            else:
+                time.sleep(0.01)  # источник ещё не отдал новый кадр
+
+            state = self.state
+            if state == LoadingState.RETRY:
+                # попап после тапа исчезает не сразу: ждём его ухода, а не
+                # жмём retry на каждый кадр, где он ещё виден
+                if seen != LoadingState.NET_ERROR:
+                    self._enter(LoadingState.WAIT_APPEAR)
+                elif time.time() - self.entered >= self.budget[state]:
+                    self._enter(LoadingState.WAIT_APPEAR)  # не ушёл - жмём снова
+            elif seen == LoadingState.NET_ERROR:
+                self._enter(LoadingState.NET_ERROR)
+                if self.retries >= self.max_retries:
+                    self._enter(LoadingState.FAILED)
+                    return False
+                self.retries += 1
+                if self.retry is not None:
+                    self.retry()
+                self._enter(LoadingState.RETRY)
+            elif state == LoadingState.WAIT_APPEAR and seen == LoadingState.LOADING:
+                self._enter(LoadingState.LOADING)
+            elif state == LoadingState.LOADING and seen == LoadingState.DONE:
+                self._enter(LoadingState.DONE)
+                return True
+            elif time.time() - self.entered >= self.budget[state]:
+                self._enter(LoadingState.FAILED)
+                return False
+
+
+def wait_loading(
+    get_frame, wait_appearance=3, timeout=30, retry=None, debug=False, scale=1
+):
+    """
+    get_frame() -> BGR кадр, уменьшенный в scale раз (1 или 2).
+    True - лоадер появился и пропал; False - не появился за wait_appearance
+    или не пропал за timeout. Ошибка сети: retry() и ожидание заново.
+    """
     print("start wait_loading") if debug else None
-    loader_1 = cv2.imread("resources/loader_1.png", cv2.IMREAD_COLOR)
-    loader_2 = cv2.imread("resources/loader_2.png", cv2.IMREAD_COLOR)
-    loader_3 = cv2.imread("resources/loader_3.png", cv2.IMREAD_COLOR)
-    net_error = cv2.imread("resources/net_error.png", cv2.IMREAD_COLOR)
-
-    def found(frame: cv2.typing.MatLike) -> bool:
-        box1, _ = find_tpl(frame, loader_1, score_threshold=0.95, debug=debug)
-        box2, _ = find_tpl(frame, loader_2, score_threshold=0.95, debug=debug)
-        box3, _ = find_tpl(frame, loader_3, score_threshold=0.95, debug=debug)
-        return ((box1 is not None) + (box2 is not None) + (box3 is not None)) > 0
-
-    t0 = time.time()
-    while time.time() - t0 < wait_appearance:
-        frame = get_frame()
-        if find_tpl(extract_game(frame), net_error)[0] is not None:
-            retry() if retry is not None else None
-            wait_loading(get_frame, wait_appearance, timeout, retry, debug)
-
-        if found(crop_loader_roi(frame)):
-            print(f"found loader after {time.time() - t0}s") if debug else None
-            t1 = time.time()
-            while time.time() - t1 < timeout:
-                frame = get_frame()
-                if find_tpl(extract_game(frame), net_error)[0] is not None:
-                    retry() if retry is not None else None
-                    wait_loading(get_frame, wait_appearance, timeout, retry, debug)
-
-                if not found(crop_loader_roi(frame)):
-                    print(
-                        f"disappeared loader after {time.time() - t1}s"
-                    ) if debug else None
-
-                    if find_tpl(extract_game(frame), net_error)[0] is not None:
-                        retry() if retry is not None else None
-                        wait_loading(get_frame, wait_appearance, timeout, retry, debug)
-
-                    return True
-            print(f"Loader still exists after {timeout}s") if debug else None
-
-    print(f"Loader did not found after {wait_appearance}s") if debug else None
-    return False
+    watch = LoadingWatch(get_frame, wait_appearance, timeout, retry, debug, scale)
+    done = watch.run()
+    phases = {k: round(v, 2) for k, v in watch.durations().items()}
+    logger.debug(f"wait_loading {watch.state.value}: {phases}")
+    return done
 
 
 if __name__ == "__main__":
@@ -172,7 +399,7 @@ if __name__ == "__main__":
     controller = Controller(device, True)
 
     def flush_bag():
-        black = cv2.imread("resources/black.png", cv2.IMREAD_COLOR)
+        black = TEMPLATES["black"]
         black_box, _ = find_tpl(device.get_frame2(), black, score_threshold=0.9)
         if black_box is None:
             print("failed to flush bag")
@@ -201,7 +428,7 @@ if __name__ == "__main__":
         time.sleep(0.5)
         check_box, _ = find_tpl(
             device.get_frame2(),
-            cv2.imread("resources/check_grade.png", cv2.IMREAD_COLOR),
+            TEMPLATES["check_grade"],
             score_threshold=0.9,
         )
         if check_box is not None:
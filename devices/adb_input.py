@@ -0,0 +1,171 @@
+import logging
+import re
+import socket
+import threading
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class AdbInputSession:
+    """
+    Долгоживущий интерактивный `shell:` к устройству через adb-сервер
+    (smart-socket протокол, tcp:5037). Команды пишутся в один поток с
+    разделением по '\\n', так что отправка тапа - одна запись в сокет вместо
+    открытия нового shell-сервиса на каждую команду.
+
+        session = AdbInputSession("127.0.0.1:58526").connect()
+        session.run("input tap 100 200")  # ждёт, пока команда отработает
+        session.run("input tap 100 200", wait=False)  # только отправить
+
+    Протокол: SERVICES.TXT / OVERVIEW.TXT в исходниках adb
+    """
+
+    def __init__(
+        self,
+        serial: str,
+        host: str = "127.0.0.1",
+        port: int = 5037,
+        timeout: float = 5.0,
+    ) -> None:
+        self.serial = serial
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        self._done = threading.Condition()
+        self._marker = 0  # последний отправленный маркер завершения
+        self._finished = 0  # последний маркер, вернувшийся из shell
+        self._reader: Optional[threading.Thread] = None
+
+    def _open(self) -> socket.socket:
+        s = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return s
+
+    @staticmethod
+    def _recv_exact(sock: socket.socket, n: int) -> bytes:
+        data = bytearray()
+        while len(data) < n:
+            chunk = sock.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("adb: соединение закрыто")
+            data.extend(chunk)
+        return bytes(data)
+
+    @classmethod
+    def _request(cls, sock: socket.socket, service: str) -> None:
+        """Отправить запрос '<hex4 длина><service>' и дождаться OKAY."""
+        payload = service.encode()
+        sock.sendall(b"%04x" % len(payload) + payload)
+        status = cls._recv_exact(sock, 4)
+        if status != b"OKAY":
+            size = int(cls._recv_exact(sock, 4), 16)
+            reason = cls._recv_exact(sock, size).decode(errors="replace")
+            raise ConnectionError(f"adb: {service}: {status.decode()} {reason}")
+
+    def connect(self) -> "AdbInputSession":
+        if ":" in self.serial:
+            # TCP-устройство должно быть известно серверу (adb connect host:port)
+            with self._open() as s:
+                self._request(s, f"host:connect:{self.serial}")
+        s = self._open()
+        try:
+            self._request(s, f"host:transport:{self.serial}")
+            self._request(s, "shell:")
+        except Exception:
+            s.close()
+            raise
+        s.settimeout(None)
+        self.sock = s
+        self._reader = threading.Thread(
+            target=self._read_loop, name="adb-input-reader", daemon=True
+        )
+        self._reader.start()
+        logger.debug("adb input session to %s via :%s", self.serial, self.port)
+        return self
+
+    def exec_once(self, command: str) -> bytes:
+        """Выполнить команду в отдельном разовом shell-сервисе, мимо сессии."""
+        with self._open() as s:
+            self._request(s, f"host:transport:{self.serial}")
+            self._request(s, f"shell:{command}")
+            out = bytearray()
+            while chunk := s.recv(4096):
+                out.extend(chunk)
+        return bytes(out)
+
+    def close(self) -> None:
+        try:
+            if self.sock:
+                self.sock.close()
+        finally:
+            self.sock = None
+            with self._done:
+                self._done.notify_all()
+
+    @property
+    def connected(self) -> bool:
+        return self.sock is not None
+
+    def _read_loop(self) -> None:
+        """Вычитывать вывод shell (эхо pty, ошибки) и отмечать маркеры завершения."""
+        marker = re.compile(rb"^RH(\d+)$")
+        buf = b""
+        sock = self.sock
+        while True:
+            try:
+                chunk = sock.recv(4096)
+            except OSError:
+                chunk = b""
+            if not chunk:
+                break
+            buf += chunk
+            *lines, buf = buf.split(b"\n")
+            for line in lines:
+                m = marker.match(line.strip())
+                if m:
+                    with self._done:
+                        self._finished = int(m.group(1))
+                        self._done.notify_all()
+                elif line.strip():
+                    logger.debug("adb shell: %s", line.strip().decode(errors="replace"))
+        self.sock = None
+        with self._done:
+            self._done.notify_all()
+
+    def run(
+        self, command: str, wait: bool = True, timeout: Optional[float] = None
+    ) -> int:
+        """
+        Отправить команду одной записью; wait=True - дождаться её завершения.
+        Возвращает номер команды для wait()/is_done().
+        """
+        if self.sock is None:
+            raise ConnectionError("adb input session is closed")
+        with self._lock:
+            self._marker += 1
+            marker = self._marker
+            # RH'' в эхе pty не совпадёт с выводом echo: там будет RH<n>
+            self.sock.sendall(f"{command}; echo RH''{marker}\n".encode())
+        if wait:
+            self.wait(marker, timeout)
+        return marker
+
+    def is_done(self, marker: int) -> bool:
+        return self._finished >= marker or self.sock is None
+
+    def wait(self, marker: Optional[int] = None, timeout: Optional[float] = None):
+        """Дождаться завершения команды marker (по умолчанию - последней)."""
+        marker = self._marker if marker is None else marker
+        with self._done:
+            ok = self._done.wait_for(
+                lambda: self._finished >= marker or self.sock is None,
+                self.timeout if timeout is None else timeout,
+            )
+        if not ok:
+            raise TimeoutError(f"adb input: no reply for command #{marker}")
+        if self._finished < marker:
+            raise ConnectionError("adb input session closed")
@@ -3,16 +3,21 @@ import os
 import logging
 import subprocess
 
+import cv2
 from adb_shell.adb_device import AdbDeviceTcp
 from adb_shell.auth.sign_pythonrsa import PythonRSASigner
 
 try:
+    from devices.adb_input import AdbInputSession
+    from devices.screencap import grab_raw_screencap
     from devices.wincap import (
         click_in_window,
         find_window_by_title,
         screenshot_window_np,
     )
 except ImportError:
+    from adb_input import AdbInputSession
+    from screencap import grab_raw_screencap
     from wincap import click_in_window, find_window_by_title, screenshot_window_np
 
 
@@ -49,19 +54,99 @@ class Device:
         self.auth_timeout_s = auth_timeout_s
         self._signer: Optional[PythonRSASigner] = None
         self.device: Optional[AdbDeviceTcp] = None
+        self.frame_source = None
+        self.first_frame_timeout = 5.0  # get_frame2() on a stream that is silent
+        self.frame_seq = 0  # sequence number of the last get_frame2() frame
+        self.input_session: Optional[AdbInputSession] = None
         self._hwnd = find_window_by_title("Rogue Hearts")
 
     def click(self, xy: tuple[int, int]):
         click_in_window(self._hwnd, xy[0], xy[1], button="left", double=False)
 
-    def get_frame(self):
-        """screenshoot from Android trough ADB"""
+    def input(self, command: str, wait: bool = True) -> None:
+        """Run an input command (e.g. "input tap 100 200") on the device.
+
+        Goes through the persistent input session when one is open, otherwise
+        opens a one-off shell service as before.
+        """
+        if self.input_session is not None and self.input_session.connected:
+            try:
+                self.input_session.run(command, wait=wait)
+                return
+            except (ConnectionError, OSError, TimeoutError) as e:
+                logger.warning("input session failed, back to one-off shell: %s", e)
+                self.input_session.close()
+                self.input_session = None
+        self.device.shell(command, decode=False)
+
+    def open_input_session(self, adb_port: int = 5037) -> bool:
+        """Open a long-lived shell through the local adb server for input().
+
+        Returns False (and keeps one-off shells) when the adb server is not
+        reachable.
+        """
+        try:
+            self.input_session = AdbInputSession(
+                f"{self.host}:{self.port}", port=adb_port
+            ).connect()
+            return True
+        except (ConnectionError, OSError) as e:
+            logger.warning("adb input session unavailable: %s", e)
+            self.input_session = None
+            return False
+
+    def get_frame(self, raw: bool = False, crop=None):
+        """screenshoot from Android trough ADB
+
+        raw=False: PNG bytes of `screencap -p`.
+        raw=True: BGR np.ndarray from uncompressed `screencap` - the device
+        skips PNG encoding and the host skips decoding; crop=(x, y, w, h)
+        is applied before the color conversion.
+        """
+        if raw:
+            return grab_raw_screencap(self.device, crop)
         return self.device.shell("screencap -p", decode=False)
 
-    def get_frame2(self):
+    def get_frame2(self, scale: int = 1):
+        """BGR frame at 1/scale of the client area (scale: 1, 2, 4 or 8).
+
+        A stream decodes straight to the reduced size; window capture is
+        shrunk after the fact. The frame's sequence number is left in
+        frame_seq: it grows with every new frame and repeats while a stream
+        has nothing newer.
+        """
+        if self.frame_source is not None:
+            return self._get_streamed_frame(scale)
         frame_bgr = screenshot_window_np(self._hwnd, client_only=True)
+        self.frame_seq += 1
+        if scale != 1:
+            h, w = frame_bgr.shape[:2]
+            size = (-(-w // scale), -(-h // scale))  # ceil, like libjpeg
+            frame_bgr = cv2.resize(frame_bgr, size, interpolation=cv2.INTER_AREA)
         return frame_bgr  # np.ndarray (H,W,3) BGR
 
+    def attach_frame_source(self, source) -> None:
+        """Serve get_frame2() from a streaming source (e.g. MinicapFrameSource).
+
+        get_frame2() then returns the newest streamed frame without blocking
+        on capture; before the first frame it waits up to first_frame_timeout
+        and raises TimeoutError. Pass None to go back to window capture.
+        """
+        self.frame_source = source
+
+    def _get_streamed_frame(self, scale: int = 1):
+        seq, frame = self.frame_source.latest(scale)
+        if frame is None:
+            # stream has just started: wait for its first frame
+            timeout = self.first_frame_timeout
+            got = self.frame_source.wait_newer(seq, timeout=timeout, scale=scale)
+            if got is None:
+                # callers use the frame right away, like a window capture
+                raise TimeoutError(f"frame source sent no frame in {timeout}s")
+            seq, frame = got
+        self.frame_seq = seq
+        return frame
+
     def _load_keys(self) -> None:
         if not os.path.exists(self.adbkey):
             raise FileNotFoundError(f"adbkey not found: {self.adbkey}")
@@ -100,6 +185,12 @@ class Device:
 
     def close(self) -> None:
         """Close the connection if open."""
+        if self.input_session is not None:
+            self.input_session.close()
+            self.input_session = None
+        if self.frame_source is not None:
+            self.frame_source.stop()
+            self.frame_source = None
         if self.device is not None:
             try:
                 # AdbDeviceTcp has a close() method
@@ -0,0 +1,342 @@
+import logging
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = 0x52484642  # "RHFB"
+# header: int64[8] = magic, slots, height, width, channels, latest_seq, 0, 0
+_HEADER_WORDS = 8
+# slot header: int64[2] = seq (-1 while being written), time.time_ns()
+_SLOT_WORDS = 2
+# buses created by this process (or inherited through fork): their
+# resource_tracker registration belongs to the creator
+_created: set[str] = set()
+
+
+class FrameBus:
+    """Ring of frames in multiprocessing.shared_memory.
+
+    One producer captures and publish()es; any number of readers - threads or
+    other processes - attach by name and get zero-copy views of the newest
+    frame. Every slot carries a sequence number written seqlock-style: -1
+    while the pixels are being written, the frame's seq afterwards.
+
+    A view stays valid until the producer wraps around the ring (slots frames
+    later); check it with is_current(seq) after use, or read(copy=True).
+
+        bus = FrameBus.create((690, 1280, 3), slots=8)  # producer
+        bus.publish(frame)
+
+        bus = FrameBus.attach(name)  # reader
+        seq, frame = bus.latest()
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        self.shm = shm
+        self.owner = owner
+        self._header = np.ndarray((_HEADER_WORDS,), np.int64, shm.buf)
+        if self._header[0] != _MAGIC:
+            raise ValueError(f"shared memory '{shm.name}' is not a frame bus")
+        self.slots, h, w, c = (int(v) for v in self._header[1:5])
+        self.shape = (h, w, c) if c > 1 else (h, w)
+        offset = self._header.nbytes
+        self._slot_headers = np.ndarray(
+            (self.slots, _SLOT_WORDS), np.int64, shm.buf, offset
+        )
+        offset += self._slot_headers.nbytes
+        self._frames = np.ndarray((self.slots, *self.shape), np.uint8, shm.buf, offset)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @classmethod
+    def create(
+        cls, shape: tuple[int, ...], slots: int = 8, name: Optional[str] = None
+    ) -> "FrameBus":
+        h, w = shape[:2]
+        c = shape[2] if len(shape) > 2 else 1
+        size = 8 * (_HEADER_WORDS + slots * _SLOT_WORDS) + slots * h * w * c
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((_HEADER_WORDS,), np.int64, shm.buf)
+        header[:] = (_MAGIC, slots, h, w, c, 0, 0, 0)
+        del header
+        bus = cls(shm, owner=True)
+        bus._slot_headers[:, 0] = -1
+        _created.add(shm.name)
+        return bus
+
+    @classmethod
+    def attach(cls, name: str) -> "FrameBus":
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name != "nt" and shm.name not in _created:
+            # POSIX resource_tracker would unlink the producer's segment when
+            # this reader process exits (bpo-39959)
+            try:
+                from multiprocessing import resource_tracker
+
+                resource_tracker.unregister(shm._name, "shared_memory")
+            except Exception:
+                pass
+        return cls(shm, owner=False)
+
+    def close(self) -> None:
+        # numpy views must go before the buffer can be released
+        self._header = self._slot_headers = self._frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # somebody still holds a view; the mapping goes away with the process
+            logger.debug("frame bus %s: views still in use", self.shm.name)
+        if self.owner:
+            self.shm.unlink()
+            _created.discard(self.shm.name)
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the newest published frame (0 - nothing yet)."""
+        return int(self._header[5])
+
+    def publish(self, frame: np.ndarray) -> int:
+        """Copy frame into the next slot; return its sequence number."""
+        if frame.shape != self.shape:
+            raise ValueError(f"frame {frame.shape} does not fit bus {self.shape}")
+        seq = self.seq + 1
+        i = seq % self.slots
+        self._slot_headers[i, 0] = -1
+        self._frames[i] = frame
+        self._slot_headers[i, 1] = time.time_ns()
+        self._slot_headers[i, 0] = seq
+        self._header[5] = seq
+        return seq
+
+    def is_current(self, seq: int) -> bool:
+        """True while the frame `seq` has not been overwritten yet."""
+        return seq > 0 and int(self._slot_headers[seq % self.slots, 0]) == seq
+
+    def timestamp(self, seq: int) -> float:
+        """time.time() of publishing frame `seq`."""
+        return int(self._slot_headers[seq % self.slots, 1]) / 1e9
+
+    def read(self, seq: int, copy: bool = False) -> Optional[np.ndarray]:
+        """Frame `seq` as a view into the ring (or a copy); None if overwritten."""
+        if not self.is_current(seq):
+            return None
+        frame = self._frames[seq % self.slots]
+        if copy:
+            frame = frame.copy()
+            if not self.is_current(seq):  # overwritten while copying
+                return None
+        return frame
+
+    def latest(self, copy: bool = False) -> tuple[int, Optional[np.ndarray]]:
+        """Newest frame as (seq, frame); (0, None) before the first frame."""
+        for _ in range(3):  # producer may lap a slow reader between the reads
+            seq = self.seq
+            if seq == 0:
+                return 0, None
+            frame = self.read(seq, copy)
+            if frame is not None:
+                return seq, frame
+        return 0, None
+
+    def wait_newer(
+        self, seq: int, timeout: Optional[float] = None, copy: bool = False
+    ) -> Optional[tuple[int, np.ndarray]]:
+        """Poll for a frame newer than `seq`; None on timeout."""
+        deadline = None if timeout is None else time.time() + timeout
+        while self.seq <= seq:
+            if deadline is not None and time.time() >= deadline:
+                return None
+            time.sleep(0.002)
+        new_seq, frame = self.latest(copy)
+        return None if frame is None else (new_seq, frame)
+
+
+class FramePublisher:
+    """Background thread that captures once per frame and publishes to a bus.
+
+    The bus is created from the first captured frame. Readers hold it by
+    name, so it is never recreated: a capture of another shape (the window
+    was resized) is not published and is kept in `error` until the window
+    is back to the bus shape.
+
+        publisher = FramePublisher(lambda: screenshot_window_np(hwnd)).start()
+        publisher.bus.name  # hand this to readers
+    """
+
+    def __init__(
+        self,
+        capture: Callable[[], Optional[np.ndarray]],
+        fps: float = 30.0,
+        slots: int = 8,
+        name: Optional[str] = None,
+    ) -> None:
+        self.capture = capture
+        self.fps = fps
+        self.slots = slots
+        self.name = name
+        self.bus: Optional[FrameBus] = None
+        self.error: Optional[Exception] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self) -> "FramePublisher":
+        if self._running:
+            return self
+        frame = self.capture()
+        if frame is None:
+            raise RuntimeError("frame bus: first capture returned no frame")
+        self.bus = FrameBus.create(frame.shape, self.slots, self.name)
+        self.bus.publish(frame)
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._loop, name="frame-publisher", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self.bus is not None:
+            self.bus.close()
+            self.bus = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def _loop(self) -> None:
+        interval = 1.0 / self.fps if self.fps > 0 else 0.0
+        next_t = time.perf_counter()
+        while self._running:
+            try:
+                frame = self.capture()
+                if frame is not None:
+                    self.bus.publish(frame)
+                    self.error = None
+            except ValueError as e:  # window resized: frame does not fit the bus
+                if self.error is None:
+                    logger.warning("frame bus %s: %s, not publishing", self.bus.name, e)
+                self.error = e
+            except Exception as e:  # window minimized: keep serving
+                logger.debug("frame bus capture failed: %s", e)
+            if interval:
+                next_t += interval
+                delay = next_t - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_t = time.perf_counter()
+
+
+class FrameBusSource:
+    """Frame source for Device.attach_frame_source() reading from a FrameBus.
+
+    copy=False hands out views into the ring: fine for code that is done with
+    a frame before `slots` newer ones are published. The bot keeps frames
+    across taps and sleeps, so it reads with copy=True.
+    """
+
+    def __init__(self, bus: FrameBus | str, copy: bool = True) -> None:
+        self.bus = FrameBus.attach(bus) if isinstance(bus, str) else bus
+        self.copy = copy
+
+    def _scaled(self, frame: np.ndarray, scale: int) -> np.ndarray:
+        if scale == 1:
+            return frame
+        h, w = frame.shape[:2]
+        size = (-(-w // scale), -(-h // scale))  # ceil, like libjpeg
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def latest(self, scale: int = 1) -> tuple[int, Optional[np.ndarray]]:
+        seq, frame = self.bus.latest(self.copy and scale == 1)
+        return seq, None if frame is None else self._scaled(frame, scale)
+
+    def wait_newer(
+        self, seq: int, timeout: Optional[float] = None, scale: int = 1
+    ) -> Optional[tuple[int, np.ndarray]]:
+        got = self.bus.wait_newer(seq, timeout, self.copy and scale == 1)
+        return None if got is None else (got[0], self._scaled(got[1], scale))
+
+    def stop(self) -> None:
+        if not self.bus.owner:
+            self.bus.close()
+
+
+def _reader_process(name: str, seconds: float, out) -> None:
+    bus = FrameBus.attach(name)
+    seq, frames, torn, frame = 0, 0, 0, None
+    t0 = time.time()
+    while time.time() - t0 < seconds:
+        got = bus.wait_newer(seq, timeout=0.5)
+        if got is None:
+            continue
+        seq, frame = got
+        # every synthetic frame is filled with seq % 256
+        if not (frame[0, 0, 0] == frame[-1, -1, -1] == seq % 256):
+            torn += 1
+        elif not bus.is_current(seq):
+            torn += 1  # read a view the producer has already overwritten
+        frames += 1
+    del frame
+    bus.close()
+    out.put((frames, torn))
+
+
+def _view(name: str) -> None:
+    """Окно отладки: показывает кадры из чужой шины, не захватывая окно игры."""
+    bus = FrameBus.attach(name)
+    seq = 0
+    while cv2.waitKey(1) != 27:  # Esc
+        got = bus.wait_newer(seq, timeout=1.0)
+        if got is not None:
+            seq, frame = got
+            cv2.imshow(f"frame bus {name}", frame)
+    frame = None
+    bus.close()
+
+
+if __name__ == "__main__":
+    import multiprocessing as mp
+    import sys
+
+    # python devices/frame_bus.py <name> - подсмотреть кадры работающей шины
+    if len(sys.argv) > 1:
+        _view(sys.argv[1])
+        sys.exit()
+
+    # python devices/frame_bus.py - один продюсер, два читателя-процесса
+    captured = 0
+
+    def capture():
+        global captured
+        captured += 1
+        return np.full((690, 1280, 3), captured % 256, np.uint8)
+
+    publisher = FramePublisher(capture, fps=60).start()
+    out = mp.Queue()
+    readers = [
+        mp.Process(target=_reader_process, args=(publisher.bus.name, 2.0, out))
+        for _ in range(2)
+    ]
+    for p in readers:
+        p.start()
+    results = [out.get() for _ in readers]
+    for p in readers:
+        p.join()
+    print(f"captured={captured} published={publisher.bus.seq}")
+    for i, (frames, torn) in enumerate(results):
+        print(f"reader {i}: frames={frames} torn={torn}")
+    publisher.stop()
@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+from typing import Optional
+
+import cv2
+import numpy as np
+
+try:
+    from devices.minicap_client import MinicapClient
+except ImportError:
+    from minicap_client import MinicapClient
+
+
+logger = logging.getLogger(__name__)
+
+# decode scale -> imdecode flag; libjpeg scales in the IDCT, so a reduced
+# decode is several times cheaper than a full one followed by a resize
+_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+class MinicapFrameSource:
+    """Latest-frame slot fed by a background minicap reader.
+
+    A reader thread drains the JPEG stream and keeps only the newest frame.
+    Decoding is lazy: a frame is decoded once, on the first request for it,
+    so frames nobody asked for are dropped without ever being decoded.
+
+    Three receive buffers rotate between the reader (back), the slot
+    (pending) and the decoder (front), so the stream is received and decoded
+    without per-frame allocations.
+
+    Consumers that tolerate a coarse image ask for scale=2/4/8 and get the
+    frame decoded directly at 1/scale; each scale is decoded and cached
+    separately, so a full-size consumer and a reduced one never interfere.
+
+        source = MinicapFrameSource(port=1313).start()
+        seq, frame = source.latest()  # never blocks on capture
+        got = source.wait_newer(seq, timeout=0.5)  # (seq, frame) | None
+        seq, small = source.latest(scale=2)  # 640x345
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 1313,
+        client: Optional[MinicapClient] = None,
+    ) -> None:
+        self.client = client or MinicapClient(host=host, port=port)
+        self._cond = threading.Condition()
+        self._decode_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        # newest received (still encoded) frame lives in _pending[:_pending_len]
+        self._back = bytearray(1 << 20)
+        self._pending = bytearray(1 << 20)
+        self._pending_len = 0
+        self._front = bytearray(1 << 20)
+        self._front_len = 0
+        self._front_seq = 0
+        self._seq = 0
+        self._ts = 0.0
+        # newest decoded frame per scale: scale -> (seq, frame)
+        self._frames: dict[int, tuple[int, np.ndarray]] = {}
+        self.dropped = 0
+
+    def start(self) -> "MinicapFrameSource":
+        if self._running:
+            return self
+        self.client.connect()
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._read_loop, name="minicap-reader", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._running = False
+        self.client.close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        with self._cond:
+            self._cond.notify_all()
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the newest received frame (0 - nothing yet)."""
+        return self._seq
+
+    @property
+    def timestamp(self) -> float:
+        """time.time() when the newest frame was received."""
+        return self._ts
+
+    def _read_loop(self) -> None:
+        while self._running:
+            size = self.client.read_frame_into(self._back)
+            if size is None:
+                logger.debug("minicap stream ended")
+                break
+            with self._cond:
+                if self._seq > self._front_seq:
+                    self.dropped += 1  # previous frame was never requested
+                self._back, self._pending = self._pending, self._back
+                self._pending_len = size
+                self._seq += 1
+                self._ts = time.time()
+                self._cond.notify_all()
+
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def _take_pending(self) -> None:
+        """Move the newest received JPEG to the decoder's buffer. Caller holds _cond."""
+        if self._seq > self._front_seq:
+            self._front, self._pending = self._pending, self._front
+            self._front_len, self._front_seq = self._pending_len, self._seq
+
+    def _decode(self, scale: int = 1) -> tuple[int, Optional[np.ndarray]]:
+        flag = _DECODE_FLAGS.get(scale)
+        if flag is None:
+            raise ValueError(
+                f"unsupported scale {scale}, expected one of {tuple(_DECODE_FLAGS)}"
+            )
+        with self._decode_lock:
+            with self._cond:
+                self._take_pending()
+            cached = self._frames.get(scale, (0, None))
+            if self._front_seq != cached[0]:
+                with memoryview(self._front) as view:
+                    data = np.frombuffer(view[: self._front_len], np.uint8)
+                    frame = cv2.imdecode(data, flag)
+                    del data
+                if frame is not None:  # broken JPEG: keep the previous frame
+                    cached = self._frames[scale] = (self._front_seq, frame)
+            return cached
+
+    def latest(self, scale: int = 1) -> tuple[int, Optional[np.ndarray]]:
+        """Newest frame as (seq, BGR frame at 1/scale); (0, None) before the first frame."""
+        return self._decode(scale)
+
+    def wait_newer(
+        self, seq: int, timeout: Optional[float] = None, scale: int = 1
+    ) -> Optional[tuple[int, np.ndarray]]:
+        """Wait for a frame newer than `seq`; None on timeout or stream end."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > seq or not self._running, timeout)
+            if self._seq <= seq:
+                return None
+        new_seq, frame = self._decode(scale)
+        return None if frame is None or new_seq <= seq else (new_seq, frame)
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.path.insert(0, ".")
+    from bot_utils.fake_minicap import FakeMinicapServer
+
+    # python devices/frame_source.py [recorded_frames_dir]
+    # без аргумента - синтетические кадры через локальный фейковый minicap
+    if len(sys.argv) > 1:
+        server = FakeMinicapServer.from_dir(sys.argv[1], fps=60)
+    else:
+        frames = []
+        for i in range(10):
+            img = np.full((690, 1280, 3), i * 20, np.uint8)
+            frames.append(cv2.imencode(".jpg", img)[1].tobytes())
+        server = FakeMinicapServer(frames, fps=60)
+
+    source = MinicapFrameSource(port=server.start()).start()
+    seq, consumed, t0 = 0, 0, time.time()
+    while time.time() - t0 < 3:
+        got = source.wait_newer(seq, timeout=1)
+        if got is None:
+            break
+        seq, frame = got
+        consumed += 1
+        time.sleep(0.05)  # медленный потребитель: лишние кадры отбрасываются
+
+    print(
+        f"received={source.seq} consumed={consumed} dropped={source.dropped} "
+        f"frame={None if frame is None else frame.shape}"
+    )
+    source.stop()
+    server.stop()
@@ -16,7 +16,9 @@ class MinicapClient:
         self.connect_timeout = connect_timeout
         self.sock: Optional[socket.socket] = None
         self.banner = {}
-        self._buf = bytearray()
+        # Переиспользуемые буферы приёма: кадр и 4-байтовый заголовок длины
+        self._buf = bytearray(1 << 20)
+        self._size_buf = bytearray(4)
 
     def connect(self):
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -33,14 +35,20 @@ class MinicapClient:
         finally:
             self.sock = None
 
+    def _recv_into(self, buf: bytearray, n: int) -> None:
+        """Прочитать ровно n байт из сокета в начало buf, без промежуточных копий."""
+        with memoryview(buf) as view:
+            got = 0
+            while got < n:
+                k = self.sock.recv_into(view[got:n], n - got)
+                if k == 0:
+                    raise ConnectionError("minicap: соединение закрыто")
+                got += k
+
     def _read_exact(self, n: int) -> bytes:
         """Прочитать ровно n байт из сокета."""
-        data = bytearray()
-        while len(data) < n:
-            chunk = self.sock.recv(n - len(data))
-            if not chunk:
-                raise ConnectionError("minicap: соединение закрыто")
-            data.extend(chunk)
+        data = bytearray(n)
+        self._recv_into(data, n)
         return bytes(data)
 
     def _read_banner(self):
@@ -86,22 +94,51 @@ class MinicapClient:
         }
         print("[minicap] banner:", self.banner)
 
-    def read_frame(self) -> Optional[bytes]:
-        """Прочитать один JPEG-фрейм (как bytes)."""
+    def _read_frame_size(self) -> Optional[int]:
         # Длина фрейма — 4 байта little-endian
         try:
-            size_buf = self._read_exact(4)
-        except Exception as e:
+            self._recv_into(self._size_buf, 4)
+        except Exception:
             return None
-        frame_size = struct.unpack("<I", size_buf)[0]
+        frame_size = struct.unpack_from("<I", self._size_buf)[0]
         if frame_size <= 0 or frame_size > 50_000_000:
             # Защита от мусора
             return None
+        return frame_size
+
+    def read_frame_into(self, buf: bytearray) -> Optional[int]:
+        """
+        Прочитать один JPEG-фрейм в начало buf (при нехватке места buf растёт).
+        Вернуть размер кадра: JPEG лежит в buf[:size]. None — конец потока/ошибка.
+        """
+        frame_size = self._read_frame_size()
+        if frame_size is None:
+            return None
+        if len(buf) < frame_size:
+            buf.extend(bytes(frame_size - len(buf) + frame_size // 4))
+        try:
+            self._recv_into(buf, frame_size)
+        except Exception:
+            return None
+        return frame_size
+
+    def read_frame(self) -> Optional[memoryview]:
+        """
+        Прочитать один JPEG-фрейм во внутренний буфер и вернуть memoryview на него
+        (годится для np.frombuffer -> cv2.imdecode без копий).
+        View действителен до следующего вызова read_frame.
+        """
+        frame_size = self._read_frame_size()
+        if frame_size is None:
+            return None
+        if len(self._buf) < frame_size:
+            # новый буфер, а не resize: старые view остаются валидными
+            self._buf = bytearray(frame_size + frame_size // 4)
         try:
-            jpeg = self._read_exact(frame_size)
-            return jpeg
+            self._recv_into(self._buf, frame_size)
         except Exception:
             return None
+        return memoryview(self._buf)[:frame_size]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+import struct
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+# `screencap` без -p пишет в stdout несжатый кадр:
+#   u32 width, u32 height, u32 format [, u32 colorspace (Android 9+)]
+# и дальше width * height * 4 байта RGBA. Заголовок 12 или 16 байт - по версии.
+_HEADER_SIZES = (12, 16)
+_RGBA_FORMATS = (1, 2)  # PIXEL_FORMAT_RGBA_8888, PIXEL_FORMAT_RGBX_8888
+
+
+def parse_raw_screencap(data: bytes | bytearray | memoryview) -> np.ndarray:
+    """Вывод `screencap` -> (H, W, 4) RGBA numpy view поверх data, без копии."""
+    if len(data) < _HEADER_SIZES[0]:
+        raise ValueError(f"screencap: {len(data)} bytes is too short for a header")
+    w, h, fmt = struct.unpack_from("<III", data, 0)
+    header = len(data) - w * h * 4
+    if header not in _HEADER_SIZES:
+        raise ValueError(f"screencap: {len(data)} bytes does not match {w}x{h} RGBA")
+    if fmt not in _RGBA_FORMATS:
+        raise ValueError(f"screencap: unsupported pixel format {fmt}")
+    return np.frombuffer(data, np.uint8, count=w * h * 4, offset=header).reshape(
+        h, w, 4
+    )
+
+
+def rgba_to_bgr(
+    rgba: np.ndarray, crop: Optional[tuple[int, int, int, int]] = None
+) -> np.ndarray:
+    """RGBA -> непрерывный BGR кадр, crop=(x, y, w, h) до конвертации.
+
+    Конвертируется только нужная область, одним проходом. Не на месте:
+    BGRX-view поверх RGBA OpenCV всё равно копирует на каждом вызове
+    (см. screenshot_window_np), а bytes от adb к тому же read-only.
+    """
+    if crop is not None:
+        x, y, w, h = crop
+        H, W = rgba.shape[:2]
+        if x < 0 or y < 0 or x + w > W or y + h > H:
+            raise ValueError(f"crop {crop} is out of screen bounds {W}x{H}")
+        rgba = rgba[y : y + h, x : x + w]
+    return cv2.cvtColor(rgba, cv2.COLOR_RGBA2BGR)
+
+
+def grab_raw_screencap(
+    adb, crop: Optional[tuple[int, int, int, int]] = None
+) -> np.ndarray:
+    """
+    Снять экран через `screencap` без PNG-кодирования на устройстве.
+    adb - AdbDeviceTcp или любая замена с shell(cmd, decode=False) -> bytes.
+    """
+    data = adb.shell("screencap", decode=False)
+    return rgba_to_bgr(parse_raw_screencap(data), crop)
@@ -1,5 +1,6 @@
 from ctypes import windll
 
+import cv2
 import numpy as np
 import win32gui
 import win32ui
@@ -80,9 +81,10 @@ def screenshot_window_np(hwnd: int, client_only: bool = False) -> np.ndarray:
     arr = arr.reshape((bmpinfo["bmHeight"], bmpinfo["bmWidth"], channels))
     # arr = np.flipud(arr)  # bottom-up -> top-down
 
-    # Оставляем BGR (OpenCV-friendly)
+    # Оставляем BGR (OpenCV-friendly). Один непрерывный буфер: срезы-ROI от него
+    # OpenCV принимает без копий, а вид arr[:, :, :3] копировался бы при каждом вызове
     if channels == 4:
-        arr = arr[:, :, :3]  # отбрасываем X/Alpha канал
+        arr = cv2.cvtColor(arr, cv2.COLOR_BGRA2BGR)  # отбрасываем X/Alpha канал
 
     # Уборка ресурсов
     win32gui.DeleteObject(bmp.GetHandle())
@@ -1,26 +1,22 @@
 import cv2 as cv
 import numpy as np
 
+from frames import FrameBundle
+
+# столько бит dHash ROI игрового поля меняется, когда персонаж сделал шаг
+MOVED_BITS = 31
+
 
 def bytes_hamming(a: bytes, b: bytes) -> int:
+    # вся подпись как одно большое число: xor и popcount за один вызов
     n = min(len(a), len(b))
-    return sum((x ^ y).bit_count() for x, y in zip(a[:n], b[:n]))
+    return (int.from_bytes(a[:n], "big") ^ int.from_bytes(b[:n], "big")).bit_count()
 
 
 def _dhash_bytes(gray, hash_size=16):  # 16→256 бит
     small = cv.resize(gray, (hash_size + 1, hash_size), interpolation=cv.INTER_AREA)
-    diff = (small[:, 1:] > small[:, :-1]).astype(np.uint8).ravel()
-    out, acc, k = [], 0, 0
-    for bit in diff:
-        acc = (acc << 1) | int(bit)
-        k += 1
-        if k == 8:
-            out.append(acc)
-            acc = 0
-            k = 0
-    if k:
-        out.append(acc << (8 - k))
-    return bytes(out)
+    # старший бит первым, хвост добивается нулями - как раньше в ручной упаковке
+    return np.packbits(small[:, 1:] > small[:, :-1]).tobytes()
 
 
 def _edge_image(gray):
@@ -35,10 +31,8 @@ def _phash_bytes(img32):
     return bytes(h.tolist())
 
 
-def roi_edge_signature(frame_bgr: cv.typing.MatLike, rect) -> bytes:
+def roi_edge_signature(frame: FrameBundle, rect) -> bytes:
     """rect = (x, y, w, h). Возвращает устойчивую «контрольную сумму» контура в ROI."""
-    x, y, w, h = rect
-    roi = frame_bgr[y : y + h, x : x + w]
-    hsv = cv.cvtColor(roi, cv.COLOR_BGR2HSV)
+    hsv = frame.roi_hsv(rect)
     img32 = _edge_image(hsv)
     return _dhash_bytes(img32)
@@ -1,9 +1,174 @@
+import zlib
+
 import cv2
+import numpy as np
+
+# Named regions of the 1280x690 client-area capture: name -> (x, y, w, h)
+ROIS = {
+    "game": (240, 0, 830, 690),
+    "minimap": (0, 100, 330, 270),
+    "loader": (550, 600, 200, 40),
+    "center": (640 - 150 - 1, 345 - 80, 300, 200),
+    "boss_health": (398, 133, 480, 10),
+}
+
+
+def crop(
+    frame: cv2.typing.MatLike, name: str, contiguous: bool = False, scale: int = 1
+) -> cv2.typing.MatLike:
+    """Return ROI `name` of the frame as a numpy view (no copy).
+
+    Views share memory with the frame: draw on a .copy(), or pass
+    contiguous=True when a contiguous buffer is really needed.
+    For a frame reduced to 1/scale (Device.get_frame2(scale)) pass the
+    same scale: the ROI is scaled with it.
+    """
+    x, y, w, h = (v // scale for v in ROIS[name])
+    H, W = frame.shape[:2]
+    if x + w > W or y + h > H:
+        raise ValueError(
+            f"ROI '{name}' {ROIS[name]} at 1/{scale} is out of frame bounds {W}x{H}"
+        )
+    view = frame[y : y + h, x : x + w]
+    return np.ascontiguousarray(view) if contiguous else view
+
+
+def extract_game(frame: cv2.typing.MatLike, scale: int = 1) -> cv2.typing.MatLike:
+    return crop(frame, "game", scale=scale)
+
+
+def extract_minimap(frame: cv2.typing.MatLike) -> cv2.typing.MatLike:
+    return crop(frame, "minimap")
+
+
+def fingerprint(frame: cv2.typing.MatLike) -> int:
+    """Cheap content hash: crc32 of the pixels, ~1 ms for a 1280x690 frame.
+
+    Identical frames give identical fingerprints; any changed pixel changes it.
+    """
+    return zlib.crc32(np.ascontiguousarray(frame))
+
+
+class FrameGate:
+    """Lets through only frames that differ from the previous one.
+
+    Polling loops capture faster than the game renders. Behind a gate a
+    detector runs once per distinct frame, and a static screen costs one
+    crc32 per poll.
+
+        gate = FrameGate()
+        frame = get_frame()
+        if gate.is_new(frame):
+            box, _ = find_tpl(frame, tpl)
+
+    seq is the capture sequence number when the source has one
+    (Device.frame_seq): a repeated seq is skipped without hashing.
+    """
+
+    def __init__(self) -> None:
+        self.seq: int | None = None
+        self.fingerprint: int | None = None
+        self.skipped = 0
+
+    def is_new(self, frame: cv2.typing.MatLike, seq: int | None = None) -> bool:
+        if seq is not None and seq == self.seq:
+            self.skipped += 1
+            return False
+        fp = fingerprint(frame)
+        self.seq = seq
+        if fp == self.fingerprint:
+            self.skipped += 1
+            return False
+        self.fingerprint = fp
+        return True
+
+
+class FrameBundle:
+    """One captured frame plus lazily computed, memoized views of it.
+
+    Every view is computed at most once per frame, so detectors that share
+    a bundle never repeat a crop or a color conversion.
+
+        bundle = FrameBundle(device.get_frame2(), device.frame_seq)
+        bundle.game  # 830x690 BGR game area
+        bundle.hsv  # HSV of the game area
+        bundle.minimap_hsv  # HSV of the minimap
+        bundle.fingerprint  # content hash, see fingerprint()
+    """
+
+    def __init__(self, frame: cv2.typing.MatLike, seq: int = 0) -> None:
+        self.frame = frame
+        self.seq = seq
+        self._views: dict = {}
+
+    def _view(self, key, make):
+        view = self._views.get(key)
+        if view is None:
+            view = make()
+            self._views[key] = view
+        return view
+
+    @property
+    def fingerprint(self) -> int:
+        return self._view("fingerprint", lambda: fingerprint(self.frame))
+
+    @property
+    def game(self) -> cv2.typing.MatLike:
+        return self._view("game", lambda: extract_game(self.frame))
+
+    @property
+    def minimap(self) -> cv2.typing.MatLike:
+        return self._view("minimap", lambda: extract_minimap(self.frame))
+
+    @property
+    def hsv(self) -> cv2.typing.MatLike:
+        return self._view("hsv", lambda: cv2.cvtColor(self.game, cv2.COLOR_BGR2HSV))
+
+    @property
+    def gray(self) -> cv2.typing.MatLike:
+        return self._view("gray", lambda: cv2.cvtColor(self.game, cv2.COLOR_BGR2GRAY))
+
+    @property
+    def lab(self) -> cv2.typing.MatLike:
+        return self._view("lab", lambda: cv2.cvtColor(self.game, cv2.COLOR_BGR2LAB))
+
+    @property
+    def minimap_hsv(self) -> cv2.typing.MatLike:
+        return self._view(
+            "minimap_hsv", lambda: cv2.cvtColor(self.minimap, cv2.COLOR_BGR2HSV)
+        )
+
+    def roi_hsv(self, rect) -> cv2.typing.MatLike:
+        """HSV of rect = (x, y, w, h) in full-frame coordinates."""
+
+        def make():
+            x, y, w, h = rect
+            return cv2.cvtColor(self.frame[y : y + h, x : x + w], cv2.COLOR_BGR2HSV)
+
+        return self._view(("roi_hsv", tuple(rect)), make)
+
+    def roi_small_gray(self, rect, factor: int) -> cv2.typing.MatLike:
+        """Gray float32 of rect = (x, y, w, h), shrunk factor times (INTER_AREA)."""
+
+        def make():
+            x, y, w, h = rect
+            small = cv2.resize(
+                self.frame[y : y + h, x : x + w],
+                (w // factor, h // factor),
+                interpolation=cv2.INTER_AREA,
+            )
+            return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+        return self._view(("roi_small_gray", tuple(rect), factor), make)
 
+    def class_bits(self, colors, part: str = "game") -> np.ndarray:
+        """Range bits of color_classes.ColorClasses `colors` over `part`.
 
-def extract_game(frame: cv2.typing.MatLike) -> cv2.typing.MatLike:
-    X = 240
-    Y = 0
-    W = 830
-    H = 690
-    return cv2.resize(frame[Y : Y + H, X : X + W], (W, H))
+        part is "game" or "minimap"; colors.space says whether the bits come
+        from its HSV view or from the BGR pixels (BgrColorClasses).
+        """
+        hsv_view = {"game": "hsv", "minimap": "minimap_hsv"}[part]
+        src = part if colors.space == "bgr" else hsv_view
+        return self._view(
+            ("class_bits", colors, part), lambda: colors.bits(getattr(self, src))
+        )
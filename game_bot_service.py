@@ -16,6 +16,7 @@ from telegram.ext import CallbackQueryHandler, ContextTypes
 
 from bot import BotRunner
 from devices.device import Device
+from devices.frame_bus import FramePublisher
 from devices.wincap import click_in_window, find_window_by_title, screenshot_window_np
 from tg.bot_config import BotConfig
 from tg.telegram_bot import TelegramBot
@@ -44,6 +45,8 @@ class GameBotService:
         # Selected boss name passed via /start_game_bot argument
         self._selected_boss: str | None = None
         self.bot_runner: BotRunner | None = None
+        # Один захват окна на всех: бот, скриншоты в Telegram, отладка
+        self.frame_publisher: FramePublisher | None = None
 
         # Добавляем дополнительные команды
         self.bot.add_command_handler("screenshot", self._screenshot_command)
@@ -131,6 +134,7 @@ class GameBotService:
             device.force_stop_rogue_hearts()
             self.hwnd = None
             device.close()
+            self._stop_frame_bus()
             await self.stop()
 
             await update.message.reply_text(f"🪟 Окно '{self.window_title}' закрыто")
@@ -145,13 +149,7 @@ class GameBotService:
                 await update.message.reply_text("❌ Окно не найдено")
                 return
 
-            frame = screenshot_window_np(self.hwnd, client_only=True)
-
-            if frame is None:
-                await update.message.reply_text("❌ Нет доступного скриншота")
-                return
-
-            image_bytes = self.bot._convert_np_to_bytes(frame)
+            image_bytes = self._latest_screenshot()
             if image_bytes is None:
                 await update.message.reply_text("❌ Ошибка при обработке изображения")
                 return
@@ -179,13 +177,7 @@ class GameBotService:
         await query.answer()
 
         try:
-            frame = screenshot_window_np(self.hwnd, client_only=True)
-
-            if frame is None:
-                await update.message.reply_text("❌ Нет доступного скриншота")
-                return
-
-            image_bytes = self.bot._convert_np_to_bytes(frame)
+            image_bytes = self._latest_screenshot()
             if image_bytes is None:
                 await update.message.reply_text("❌ Ошибка при обработке изображения")
                 return
@@ -206,6 +198,41 @@ class GameBotService:
             except Exception:
                 pass
 
+    def _ensure_frame_bus(self) -> FramePublisher:
+        """Запустить захват окна в общую память (один раз на сервис)."""
+        if self.frame_publisher is None or not self.frame_publisher.running:
+            if not self.hwnd:
+                self._find_window()
+            self.frame_publisher = FramePublisher(
+                lambda: screenshot_window_np(self.hwnd, client_only=True)
+            ).start()
+        return self.frame_publisher
+
+    def _stop_frame_bus(self):
+        """Остановить захват окна и освободить общую память шины."""
+        if self.frame_publisher is not None:
+            self.frame_publisher.stop()
+            self.frame_publisher = None
+
+    def _latest_screenshot(self):
+        """PNG последнего кадра из шины; None, если кадра нет."""
+        publisher = self._ensure_frame_bus()
+        if publisher.error is not None:
+            # окно сменило размер: в шине только старые кадры
+            raise RuntimeError(f"захват окна: {publisher.error}")
+        bus = publisher.bus
+        seq, frame = bus.latest()
+        if frame is None:
+            return None
+        image_bytes = self.bot._convert_np_to_bytes(frame)
+        if not bus.is_current(seq):
+            # кадр перезаписан, пока кодировали: взять копию свежего
+            seq, frame = bus.latest(copy=True)
+            if frame is None:
+                return None
+            image_bytes = self.bot._convert_np_to_bytes(frame)
+        return image_bytes
+
     def _find_window(self):
         """Поиск целевого окна"""
         try:
@@ -233,7 +260,9 @@ class GameBotService:
             return
 
         try:
-            self.bot_runner = BotRunner(self._selected_boss)
+            self.bot_runner = BotRunner(
+                self._selected_boss, frame_bus=self._ensure_frame_bus().bus.name
+            )
             self.bot_runner.go()
 
         except Exception as e:
@@ -361,6 +390,7 @@ class GameBotService:
             # Optionally, set a flag here to signal the thread to stop if your worker supports it.
             self.game_bot_thread.join(timeout=5)
             self.bot_runner = None
+        self._stop_frame_bus()
 
         message = "⏹️ Сервис остановлен."
         print(message)
@@ -0,0 +1,73 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class InputQueue:
+    """
+    Очередь ввода с одним потоком-диспетчером: команды уходят на устройство
+    строго по порядку, а пауза после каждой выдерживается в этом же потоке,
+    а не в вызывающем. Вызывающий получает Future и ждёт его только там, где
+    важен порядок (например, перед снятием кадра).
+
+        q = InputQueue()
+        q.submit(device.input, "input tap 220 425", after=0.17)
+        ...  # анализ предыдущего кадра, пока тап в пути
+        q.flush()  # всё отправлено и паузы выдержаны
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue = queue.Queue()
+        self._last: Future | None = None
+        self._thread = threading.Thread(
+            target=self._loop, name="input-queue", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args, after: float = 0.0) -> Future:
+        """Поставить fn(*args) в очередь; Future завершится после паузы after."""
+        future: Future = Future()
+        self._last = future
+        self._queue.put((fn, args, after, future))
+        return future
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Дождаться отправки всего, что уже стоит в очереди."""
+        last = self._last
+        if last is not None:
+            last.result(timeout)
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=2)
+
+    def _loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                fn, args, after, future = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result = fn(*args)
+                    if after > 0:
+                        time.sleep(after)
+                except Exception as e:
+                    # ошибку увидит тот, кто ждёт Future; остальным - в лог
+                    logger.debug(f"queued input {fn.__name__}{args} failed: {e}")
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+# pid скрипта макроса на устройстве - чтобы его можно было прервать
+PID_FILE = "/data/local/tmp/rh_macro.pid"
+
+
+class Macro:
+    """
+    Фиксированная последовательность тапов и пауз, которая целиком уходит на
+    устройство одним shell-скриптом: паузы отсчитывает `sleep` на устройстве,
+    а не хост между отдельными командами.
+
+        macro = Macro().tap((220, 425), 0.24).tap((270, 460), 0.24)
+        run = controller.run_macro(macro)
+        ...
+        run.abort()
+    """
+
+    def __init__(self) -> None:
+        # ("tap", (x, y)) | ("press", (x, y), ms) | ("sleep", seconds)
+        self.steps: list[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def tap(self, xy: cv2.typing.Point, delay: float = 0.0) -> "Macro":
+        self.steps.append(("tap", (int(xy[0]), int(xy[1]))))
+        return self.sleep(delay)
+
+    def press(self, xy: cv2.typing.Point, time_ms: int, delay=0.0) -> "Macro":
+        self.steps.append(("press", (int(xy[0]), int(xy[1])), int(time_ms)))
+        return self.sleep(delay)
+
+    def sleep(self, seconds: float) -> "Macro":
+        if seconds > 0:
+            self.steps.append(("sleep", float(seconds)))
+        return self
+
+    @property
+    def duration(self) -> float:
+        """Сумма пауз и нажатий, с; само выполнение `input` сюда не входит."""
+        total = 0.0
+        for step in self.steps:
+            if step[0] == "sleep":
+                total += step[1]
+            elif step[0] == "press":
+                total += step[2] / 1000
+        return total
+
+    def commands(self) -> list[str]:
+        out = []
+        for step in self.steps:
+            if step[0] == "tap":
+                out.append("input tap %d %d" % step[1])
+            elif step[0] == "press":
+                (x, y), ms = step[1], step[2]
+                out.append(f"input swipe {x} {y} {x} {y} {ms}")
+            else:
+                out.append(f"sleep {step[1]:.3f}")
+        return out
+
+    def compile(self) -> str:
+        """Одна shell-команда: `sh -c` запоминает свой pid для abort()."""
+        script = "; ".join([f"echo $$ > {PID_FILE}", *self.commands()])
+        return f"sh -c '{script}'"
+
+
+class MacroRun:
+    """
+    Запущенный макрос. Если у устройства открыт input session, скрипт
+    исполняется на устройстве целиком; иначе шаги идут из фонового потока
+    хоста. В обоих случаях его можно прервать между шагами.
+    """
+
+    def __init__(self, controller, macro: Macro) -> None:
+        self.controller = controller
+        self.macro = macro
+        self.started = time.time()
+        self._aborted = threading.Event()
+        self._marker = None
+        self._thread = None
+
+        device = controller.device
+        session = device.input_session
+        if not controller.use_click and session is not None and session.connected:
+            self._session = session
+            self._marker = session.run(macro.compile(), wait=False)
+        else:
+            self._session = None
+            self._thread = threading.Thread(
+                target=self._run_on_host, name="macro", daemon=True
+            )
+            self._thread.start()
+
+    def _run_on_host(self) -> None:
+        for step in self.macro.steps:
+            if self._aborted.is_set():
+                return
+            if step[0] == "tap":
+                sent = self.controller._tap(step[1])
+            elif step[0] == "press":
+                sent = self.controller.press(*step[1], step[2])
+            elif self._aborted.wait(step[1]):
+                return
+            else:
+                continue
+            if sent is not None:  # async_input: паузы считать от отправки
+                sent.result()
+
+    @property
+    def elapsed(self) -> float:
+        return time.time() - self.started
+
+    @property
+    def done(self) -> bool:
+        if self._session is not None:
+            return self._session.is_done(self._marker)
+        return not self._thread.is_alive()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Дождаться конца макроса; False - истёк timeout."""
+        if self._session is not None:
+            if timeout is None:  # весь макрос + запас на сами `input`
+                left = self.macro.duration - self.elapsed
+                timeout = max(0.0, left) + self._session.timeout
+            try:
+                self._session.wait(self._marker, timeout)
+            except TimeoutError:
+                return False
+            return True
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def abort(self) -> None:
+        """Остановить оставшиеся шаги (текущий `input` доработает)."""
+        self._aborted.set()
+        if self._session is not None and not self.done:
+            # отдельный разовый shell: сессия занята самим скриптом
+            self._session.exec_once(f"kill $(cat {PID_FILE})")
+        logger.debug(f"macro aborted after {self.elapsed:.2f}s")
@@ -6,22 +6,19 @@ import cv2
 from boss.boss import Boss
 from controller import Controller
 from devices.device import Device
-from edges_diff import bytes_hamming, roi_edge_signature
-from frames import extract_game
+from edges_diff import MOVED_BITS, bytes_hamming, roi_edge_signature
+from frames import FrameBundle, crop
 from model import Direction
+from motion import MotionCheck
 
 
-THRESHOLD_BITS = 31
+THRESHOLD_BITS = MOVED_BITS
 
 logger = logging.getLogger(__name__)
 
 
 def extract_center(frame: cv2.typing.MatLike) -> cv2.typing.MatLike:
-    X = 640 - 150 - 1
-    Y = 345 - 80
-    W = 300
-    H = 200
-    return cv2.resize(frame[Y : Y + H, X : X + W], (W, H))
+    return crop(frame, "center")
 
 
 class MazeRH:
@@ -46,10 +43,12 @@ class MazeRH:
         self.debug = debug
         self.moves = 0
         self.last_combat = 0
+        self.motion = MotionCheck()
 
     def init_camera(self) -> None:
         # Initial move to get the camera right
         self._last_frame = None
+        self.motion.reset()
         self.boss.init_camera()
         self._is_exit = (False, None)
         self.moves = 0
@@ -76,14 +75,14 @@ class MazeRH:
             self.boss.sensor.move(d)
 
             if _ != self.boss.sensor.steps - 1:
-                frame830x690 = extract_game(self.get_frame())
-                frame830x690hsv = cv2.cvtColor(frame830x690, cv2.COLOR_BGR2HSV)
-                self._enemies = self._count_enemies(frame830x690)
-                self._is_exit = self.boss.is_near_exit(frame830x690hsv, frame830x690)
+                frame = self._get_bundle()
+                self._enemies = self._count_enemies(frame)
+                self._is_exit = self.boss.is_near_exit(frame)
 
             if self._is_exit[0] and self._enemies == 0:
                 return True
 
+        self.controller.flush()  # async_input: последний шаг ещё мог быть в пути
         time.sleep(0.15 if self.boss.sensor.fa else 0)
 
         new_frame = self._sense()
@@ -98,24 +97,29 @@ class MazeRH:
 
         return is_moved
 
-    def _is_moved(self, frame: cv2.typing.MatLike, d: Direction):
-        # ttt = newFrame.copy()
-        # cv2.rectangle(ttt, (15, 120), (15 + 1255, 120 + 415), (0, 255, 0), 1)
-        # cv2.imshow("newFrame", ttt)
-        # cv2.waitKey(0)
-
+    def _is_moved(self, frame: FrameBundle, d: Direction):
         # newFrame = roi_edge_signature(self.sense(), (365, 150, 570, 400)) # Bhalor works OK
         newFrame = roi_edge_signature(frame, (15, 120, 1255, 415))
 
-        diff = True
-        if self._last_frame is not None:
+        moved = None
+        if self.boss.motion_check:
+            moved = self.motion.moved(frame, d)
+            if moved is not None:
+                dx, dy, response = self.motion.last
+                logger.debug(
+                    f"Measuring move to {d}, shift: ({dx:.0f}, {dy:.0f}) "
+                    f"response: {response:.2f} partial: {self.motion.partial}"
+                )
+
+        if moved is None and self._last_frame is not None:
             bytess = bytes_hamming(self._last_frame, newFrame)
-            logger.debug(f"Measuring move to {d}, diff bits: {bytess} > {THRESHOLD_BITS}")
-            diff = bytess >= THRESHOLD_BITS
+            logger.debug(
+                f"Measuring move to {d}, diff bits: {bytess} > {THRESHOLD_BITS}"
+            )
+            moved = bytess >= THRESHOLD_BITS
 
         self._last_frame = newFrame
-        del newFrame
-        return diff
+        return True if moved is None else moved
 
     def _clear_enemies(self, use_skills=True) -> bool:
         attacks_count = 0
@@ -139,47 +143,46 @@ class MazeRH:
         self.last_combat = self.moves
         return False
 
-    def _count_enemies(self, frame830x690: cv2.typing.MatLike | None = None) -> int:
-        return self.boss.count_enemies(
-            extract_game(self.get_frame()) if frame830x690 is None else frame830x690
-        )
+    def _count_enemies(self, frame: FrameBundle | None = None) -> int:
+        return self.boss.count_enemies(self._get_bundle() if frame is None else frame)
 
     def can_move(self, d: Direction) -> bool:
         return self._direction_dict.get(d, False)
 
     def get_frame(self) -> cv2.typing.MatLike:
-        return self.controller.device.get_frame2()
+        return self.controller.get_frame()
+
+    def _get_bundle(self) -> FrameBundle:
+        frame = self.get_frame()
+        return FrameBundle(frame, self.controller.device.frame_seq)
 
-    def _get_frame_fa(self) -> cv2.typing.MatLike:
+    def _get_frame_fa(self) -> FrameBundle:
         if self.boss.sensor.fa:
-            self.controller.click(self.controller.skill_1_point)
-            time.sleep(0.105)
+            self.controller.click(self.controller.skill_1_point, after=0.105)
 
-        frame = self.get_frame()
+        frame = self._get_bundle()
 
         if self.boss.sensor.fa:
-            self.controller.click(self.controller.skill_1_point_cancel)
-            time.sleep(0.06)
+            # с async_input отмена уходит, пока кадр уже анализируется;
+            # следующий кадр всё равно дождётся её через get_frame()
+            self.controller.click(self.controller.skill_1_point_cancel, after=0.06)
 
         return frame
 
-    def _open_dirs(self, frame):
+    def _open_dirs(self, frame: FrameBundle):
         return self.boss.sensor.open_dirs(frame)
 
-    def _sense(self) -> cv2.typing.MatLike:
-        decoded = self._get_frame_fa()
-        frame830x690 = extract_game(decoded)
-
-        frame830x690hsv = cv2.cvtColor(frame830x690, cv2.COLOR_BGR2HSV)
+    def _sense(self) -> FrameBundle:
+        frame = self._get_frame_fa()
         # detect exit
-        self._is_exit = self.boss.is_near_exit(frame830x690hsv, frame830x690)
+        self._is_exit = self.boss.is_near_exit(frame)
         # detect enemies
-        self._enemies = self._count_enemies(frame830x690)
+        self._enemies = self._count_enemies(frame)
         if self._enemies > 0:
             self._clear_enemies(self.boss.use_slide)
 
         # detect possible directions
-        self._direction_dict = self._open_dirs(decoded)
+        self._direction_dict = self._open_dirs(frame)
 
         # Check if all directions are zero
         if all(not v for v in self._direction_dict.values()):
@@ -187,11 +190,10 @@ class MazeRH:
                 "Warning: All direction possibilities are zero. Sensing again..."
             )
             self.boss.fix_disaster()
-            decoded = self._get_frame_fa()
-            frame830x690 = extract_game(decoded)
-            self._direction_dict = self._open_dirs(decoded)
+            frame = self._get_frame_fa()
+            self._direction_dict = self._open_dirs(frame)
 
-        return decoded
+        return frame
 
 
 if __name__ == "__main__":
@@ -224,10 +226,9 @@ if __name__ == "__main__":
     # # TEST is_near_exit
     while 1:
         # maze._sense()
-        frame830x690 = extract_game(maze.get_frame())
-        frame830x690hsv = cv2.cvtColor(frame830x690, cv2.COLOR_BGR2HSV)
-        res, _ = boss.is_near_exit(frame830x690hsv, frame830x690)
-        # _enemies = maze._count_enemies(frame830x690hsv, frame830x690)
+        frame = FrameBundle(maze.get_frame())
+        res, _ = boss.is_near_exit(frame)
+        # _enemies = maze._count_enemies(frame)
         print(res, _)
         cv2.waitKey(10)
 
@@ -0,0 +1,97 @@
+import math
+
+import cv2 as cv
+import numpy as np
+
+from frames import FrameBundle
+from model import Direction
+
+MOTION_FACTOR = 8  # ROI ужимается в 8 раз: 1255x415 -> 156x51
+MIN_RESPONSE = 0.3  # у несвязанных кадров пик до ~0.25, у сдвига 0.75+
+MIN_SHIFT_PX = 12  # сдвиг сцены (в пикселях полного кадра), считающийся шагом
+
+_windows: dict[tuple[int, int], np.ndarray] = {}
+
+
+def _hanning(shape) -> np.ndarray:
+    window = _windows.get(shape)
+    if window is None:
+        window = cv.createHanningWindow((shape[1], shape[0]), cv.CV_32F)
+        _windows[shape] = window
+    return window
+
+
+def motion_image(frame: FrameBundle, rect, factor=MOTION_FACTOR) -> np.ndarray:
+    """Уменьшенный серый ROI rect = (x, y, w, h) для estimate_motion."""
+    return frame.roi_small_gray(rect, factor)
+
+
+def estimate_motion(
+    prev: np.ndarray, cur: np.ndarray, factor=MOTION_FACTOR
+) -> tuple[float, float, float]:
+    """
+    (dx, dy, response): на сколько пикселей полного кадра сдвинулась сцена
+    от prev к cur и уверенность фазовой корреляции (0..1).
+    """
+    (dx, dy), response = cv.phaseCorrelate(prev, cur, _hanning(prev.shape))
+    return dx * factor, dy * factor, response
+
+
+def shift_along(dx: float, dy: float, d: Direction) -> float:
+    """
+    Проекция сдвига сцены на шаг героя d. Камера идёт за героем, поэтому
+    сцена сдвигается навстречу шагу: положительное значение - шаг в сторону d.
+    """
+    return -(dx * d.dx + dy * d.dy) / math.sqrt(2)
+
+
+class MotionCheck:
+    """
+    Подтверждение шага по сдвигу сцены: направление, величина и доля клетки.
+    Величину полного шага узнаёт сама - медиана подтверждённых сдвигов.
+
+        check = MotionCheck()
+        check.moved(frame, Direction.NE)  # True / None (решать другим способом)
+
+    "Не сдвинулись" не выносит: в ROI есть неподвижные миникарта и сетка,
+    они тянут пик корреляции к нулю, а ложный отказ - это fix_blockage.
+    Проверка на записанных кадрах - bot_utils/verify_motion.py.
+    """
+
+    def __init__(self, rect=(15, 120, 1255, 415), history=15) -> None:
+        self.rect = rect
+        self.history = history
+        self.steps: list[float] = []  # сдвиги последних полных шагов
+        self.partial = 0  # шагов короче половины обычного
+        self.last: tuple[float, float, float] | None = None
+        self._prev: np.ndarray | None = None
+
+    def reset(self) -> None:
+        self._prev = None
+
+    @property
+    def step_px(self) -> float | None:
+        return float(np.median(self.steps)) if self.steps else None
+
+    def moved(self, frame: FrameBundle, d: Direction) -> bool | None:
+        """
+        Сдвинулась ли сцена от прошлого кадра на шаг в сторону d. None -
+        прошлого кадра нет, корреляция слабая или сдвига в сторону d не
+        видно: решать другим способом (dHash).
+        """
+        cur = motion_image(frame, self.rect)
+        prev, self._prev = self._prev, cur
+        if prev is None or prev.shape != cur.shape:
+            return None
+        dx, dy, response = self.last = estimate_motion(prev, cur)
+        if response < MIN_RESPONSE:
+            return None
+        along = shift_along(dx, dy, d)
+        if along < MIN_SHIFT_PX or along < math.hypot(dx, dy) * 0.7:
+            return None  # сдвига к d не видно - это ещё не значит, что стоим
+        step = self.step_px
+        if step is not None and along < step / 2:
+            self.partial += 1
+        else:
+            self.steps = (self.steps + [along])[-self.history :]
+        return True
@@ -0,0 +1,71 @@
+import math
+
+import cv2
+import numpy as np
+
+_steps: dict[tuple[float, int], tuple[np.ndarray, np.ndarray]] = {}
+
+
+def _ray_steps(angle: float, max_len: int) -> tuple[np.ndarray, np.ndarray]:
+    """[старт, dx, dx, ...] и то же для dy - для накопления cumsum."""
+    key = (angle, max_len)
+    steps = _steps.get(key)
+    if steps is None:
+        dx = np.full(max_len + 1, math.cos(math.radians(angle)))
+        dy = np.full(max_len + 1, math.sin(math.radians(angle)))
+        steps = _steps[key] = (dx, dy)
+    return steps
+
+
+def cast_rays(
+    mask: cv2.typing.MatLike,
+    start_x: float,
+    start_y: float,
+    angles,
+    max_len: int,
+    bounds: tuple[int, int] | None = None,
+    debug_minimap: cv2.typing.MatLike = None,
+) -> list[int]:
+    """
+    Длины лучей из (start_x, start_y) по маске (255 - проход) для всех
+    angles сразу: один cumsum координат, одна выборка из маски и поиск
+    первого промаха. Совпадает с пошаговым Sensor.ray_len: координаты
+    накапливаются так же (cumsum складывает по порядку), округление то же
+    (к чётному), длина - до последней точки прохода перед первым промахом,
+    луч обрывается на краю bounds = (W, H).
+    """
+    W, H = bounds if bounds is not None else (mask.shape[1], mask.shape[0])
+    n = len(angles)
+    xs = np.empty((n, max_len + 1))
+    ys = np.empty((n, max_len + 1))
+    for i, angle in enumerate(angles):
+        xs[i], ys[i] = _ray_steps(angle, max_len)
+    xs[:, 0] = start_x
+    ys[:, 0] = start_y
+    xs = np.cumsum(xs, axis=1)[:, 1:]
+    ys = np.cumsum(ys, axis=1)[:, 1:]
+    xi = np.rint(xs).astype(np.intp)
+    yi = np.rint(ys).astype(np.intp)
+
+    inside = (xi >= 0) & (yi >= 0) & (xi < W) & (yi < H)
+    # луч заканчивается на первом выходе за край, даже если потом вернётся
+    inside = np.logical_and.accumulate(inside, axis=1)
+    hit = np.zeros(inside.shape, bool)
+    hit[inside] = mask[yi[inside], xi[inside]] == 255
+    # точки прохода до первого промаха: промах или край обрывает серию
+    run = np.logical_and.accumulate(hit, axis=1)
+    count = run.sum(axis=1)
+
+    lengths = []
+    for i in range(n):
+        k = count[i] - 1
+        if k < 0:
+            lengths.append(0)
+            continue
+        length = math.hypot(xs[i, k] - start_x, ys[i, k] - start_y)
+        lengths.append(int(round(length)))
+
+    if debug_minimap is not None:
+        colors = np.where(hit[inside][:, None], (0, 255, 0), (0, 0, 255))
+        debug_minimap[yi[inside], xi[inside]] = colors
+    return lengths
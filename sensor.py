@@ -4,15 +4,49 @@ import math
 from collections import deque
 import cv2
 import numpy as np
+from color_classes import ColorClasses, color_classes
 from db import FA_BHALOR, NE_RECT, NW_RECT, SE_RECT, SW_RECT
-from frames import extract_game
+from frames import FrameBundle, extract_minimap
 from model import Direction
+from raycast import cast_rays
 
 logger = logging.getLogger(__name__)
 
 
+def minimap_classes(mask_colors) -> ColorClasses:
+    """Коридор (l1-u1) и игрок (l1-u1, l2-u2) миникарты одним проходом."""
+    classes = {"path": [(mask_colors["path"]["l1"], mask_colors["path"]["u1"])]}
+    player = mask_colors.get("player")
+    if player is not None:
+        classes["player"] = [(player["l1"], player["u1"]), (player["l2"], player["u2"])]
+    return color_classes(classes)
+
+
+class MaskHistory:
+    """
+    OR последних n масок 0/255 без хранения самих масок: age - сколько
+    кадров назад пиксель был в маске (насыщается на 255). Кадр - одно
+    обновление age, объединение - одно сравнение age < n.
+    """
+
+    def __init__(self, n: int = 7) -> None:
+        if not 1 <= n <= 255:
+            raise ValueError(f"history length {n} out of 1..255")
+        self.n = n
+        self.age: np.ndarray | None = None
+
+    def append(self, mask: cv2.typing.MatLike) -> cv2.typing.MatLike:
+        """Добавить маску и вернуть OR последних n (включая её)."""
+        if self.age is None or self.age.shape != mask.shape:
+            self.age = np.full(mask.shape, 255, np.uint8)  # ещё не видели
+        # +1 всем, и 0 там, где пиксель виден сейчас: age - 255 насыщается в 0
+        self.age = cv2.subtract(cv2.add(self.age, 1), mask)
+        return cv2.compare(self.age, self.n, cv2.CMP_LT)
+
+
 class Sensor(ABC):
     max_ray_len = 25
+    mask_history = 7  # find_blue_mask объединяет столько последних кадров
     W = 330
     H = 270
     ANGLE = {
@@ -25,8 +59,9 @@ class Sensor(ABC):
     def __init__(self, frame, mask_colors, thresholds=None, debug=False) -> None:
         self.first_open_dirs_call = True
         self.mask_colors = mask_colors
+        self.colors = minimap_classes(mask_colors) if mask_colors else None
         self.debug = debug
-        self._blue_masks = deque(maxlen=7)
+        self._blue_masks = MaskHistory(self.mask_history)
         self.last_move_dir = Direction.SE
         self.thresholds = thresholds
         self.steps = 1
@@ -40,7 +75,7 @@ class Sensor(ABC):
         return 0.0, 0.0
 
     @abstractmethod
-    def open_dirs(self, frame: cv2.typing.MatLike) -> dict:
+    def open_dirs(self, frame: FrameBundle) -> dict:
         return {
             Direction.NE: False,
             Direction.NW: False,
@@ -49,15 +84,11 @@ class Sensor(ABC):
         }
 
     def extract_minimap(self, frame: cv2.typing.MatLike) -> cv2.typing.MatLike:
-        X = 0
-        Y = 100
-        W = self.W
-        H = self.H
-        return cv2.resize(frame[Y : Y + H, X : X + W], (W, H))
+        return extract_minimap(frame)
 
-    def find_blue_mask(self, hsv, mask_colors):
+    def find_blue_mask(self, frame: FrameBundle):
         """Возвращает маску синих коридоров (uint8 0/255)."""
-        mask = cv2.inRange(hsv, mask_colors["l1"], mask_colors["u1"])
+        mask = self.colors.frame_mask(frame, "path", "minimap")
         # Убираем шум, заполняем дырки
         # create a custom diamond-shaped kernel
         kernel = np.array(
@@ -75,13 +106,7 @@ class Sensor(ABC):
         # kernel = cv2.getStructuringElement(cv2.MORPH_DIAMOND, (7, 7))
         mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=1)
         mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=1)
-        self._blue_masks.append(mask)
-
-        combined_mask = self._blue_masks[0].copy()
-        for history_mask in list(self._blue_masks)[1:]:
-            combined_mask = cv2.bitwise_or(combined_mask, history_mask)
-
-        return combined_mask
+        return self._blue_masks.append(mask)
 
     def ray_len(
         self,
@@ -91,30 +116,20 @@ class Sensor(ABC):
         angle: float,
         debug_minimap: cv2.typing.MatLike = None,
     ) -> int:
-        length = 0
-        dx = math.cos(math.radians(angle))
-        dy = math.sin(math.radians(angle))
-        x = start_x
-        y = start_y
-        len_sealed = False
-        for _ in range(1, self.max_ray_len + 1):
-            x += dx
-            y += dy
-            xi, yi = int(round(x)), int(round(y))
-            if xi < 0 or yi < 0 or xi >= self.max_xy[0] or yi >= self.max_xy[1]:
-                break
-            if mask[yi, xi] == 255:
-                length = (
-                    math.hypot(x - start_x, y - start_y) if not len_sealed else length
-                )
-                if debug_minimap is not None:
-                    debug_minimap[yi, xi] = (0, 255, 0)
-            else:
-                len_sealed = True
-                if debug_minimap is not None:
-                    debug_minimap[yi, xi] = (0, 0, 255)
+        return self.ray_lens(mask, start_x, start_y, [angle], debug_minimap)[0]
 
-        return int(round(length))
+    def ray_lens(
+        self,
+        mask: cv2.typing.MatLike,
+        start_x: float,
+        start_y: float,
+        angles,
+        debug_minimap: cv2.typing.MatLike = None,
+    ) -> list[int]:
+        """Длины лучей под углами angles (градусы) за один проход, см. cast_rays."""
+        return cast_rays(
+            mask, start_x, start_y, angles, self.max_ray_len, self.max_xy, debug_minimap
+        )
 
 
 class MinimapSensor2(Sensor):
@@ -203,9 +218,8 @@ class MinimapSensor2(Sensor):
     def __init__(self, frame, mask_colors, thresholds=None, debug=False):
         super().__init__(frame, mask_colors, thresholds, debug)
 
-        minimap = self.extract_minimap(frame)
-        hsv = cv2.cvtColor(minimap, cv2.COLOR_BGR2HSV)
-        blue_mask = self.find_blue_mask(hsv, self.mask_colors["path"])
+        minimap = frame.minimap.copy() if debug else frame.minimap
+        blue_mask = self.find_blue_mask(frame)
         h, w = blue_mask.shape[:2]
         white_pixels = np.column_stack(np.where(blue_mask == 255))
         if white_pixels.size == 0:
@@ -220,8 +234,11 @@ class MinimapSensor2(Sensor):
 
     def _calibrate_initial_xy(self, blue_mask):
         print("Calibrating initial position...")
-        ne_length = self.ray_len(blue_mask, *self.current_xy, self.ANGLE[Direction.NE])
-        sw_length = self.ray_len(blue_mask, *self.current_xy, self.ANGLE[Direction.SW])
+        ne_length, sw_length = self.ray_lens(
+            blue_mask,
+            *self.current_xy,
+            [self.ANGLE[Direction.NE], self.ANGLE[Direction.SW]],
+        )
         diff = (ne_length - sw_length) / 2
         dx = diff * math.cos(math.radians(self.ANGLE[Direction.NE]))
         dy = diff * math.sin(math.radians(self.ANGLE[Direction.NE]))
@@ -239,7 +256,7 @@ class MinimapSensor2(Sensor):
 
     def open_dirs(
         self,
-        frame: cv2.typing.MatLike,
+        frame: FrameBundle,
     ) -> dict:
         if self.first_open_dirs_call:
             self.first_open_dirs_call = False
@@ -251,9 +268,8 @@ class MinimapSensor2(Sensor):
             }
 
         lengths = {}
-        minimap = self.extract_minimap(frame)
-        hsv = cv2.cvtColor(minimap, cv2.COLOR_BGR2HSV)
-        mask = self.find_blue_mask(hsv, self.mask_colors["path"])
+        minimap = frame.minimap.copy() if self.debug else frame.minimap
+        mask = self.find_blue_mask(frame)
 
         for dir in self.ANGLE.keys():
             lengths[dir] = self._test_direction(
@@ -293,7 +309,6 @@ class MinimapSensor2(Sensor):
         debug_minimap: cv2.typing.MatLike = None,
     ) -> tuple[float, float]:
         angle = self.ANGLE[dir]  # degrees
-        self.ray_len(mask, *self.current_xy, angle, debug_minimap)
 
         if dir == Direction.SE:
             left_angle = angle - 19
@@ -308,8 +323,10 @@ class MinimapSensor2(Sensor):
             left_angle = angle - 21
             right_angle = angle + 19
 
-        left_length = self.ray_len(mask, *self.current_xy, left_angle, debug_minimap)
-        right_length = self.ray_len(mask, *self.current_xy, right_angle, debug_minimap)
+        # прямой луч - только для отладочной картинки, как и раньше
+        _, left_length, right_length = self.ray_lens(
+            mask, *self.current_xy, [angle, left_angle, right_angle], debug_minimap
+        )
 
         return left_length, right_length
 
@@ -343,11 +360,10 @@ class MinimapSensor(Sensor):
         )
         return polygon
 
-    def open_dirs(self, frame: cv2.typing.MatLike):
-        minimap = self.extract_minimap(frame)
-        hsv = cv2.cvtColor(minimap, cv2.COLOR_BGR2HSV)
-        lab = self.find_blue_mask(hsv, self.mask_colors["path"])
-        pm = self.player_mask(hsv, lab, self.mask_colors["player"])
+    def open_dirs(self, frame: FrameBundle):
+        minimap = frame.minimap.copy() if self.debug else frame.minimap
+        lab = self.find_blue_mask(frame)
+        pm = self.player_mask(frame, lab)
         p_xy = self.find_largest_contour_centroid(pm)
         self.p_xy.append(p_xy)
         lab = cv2.bitwise_and(lab, lab, mask=self.nogo_mask)
@@ -504,14 +520,14 @@ class MinimapSensor(Sensor):
         return result
 
     def player_mask(
-        self, hsv: cv2.typing.MatLike, lab: cv2.typing.MatLike, masks
+        self, frame: FrameBundle, lab: cv2.typing.MatLike
     ) -> cv2.typing.MatLike:
         zone = cv2.dilate(lab.copy(), np.ones((5, 5), np.uint8), iterations=1)
-        hsv = cv2.bitwise_and(hsv, hsv, mask=zone)
-
-        pm1 = cv2.inRange(hsv, masks["l1"], masks["u1"])
-        pm2 = cv2.inRange(hsv, masks["l2"], masks["u2"])
-        pm = cv2.bitwise_or(pm1, pm2)
+        # те же биты кадра, что и у коридора; вне zone hsv раньше
+        # обнулялся, а (0, 0, 0) тоже может попадать в диапазон
+        pm = cv2.bitwise_and(self.colors.frame_mask(frame, "player", "minimap"), zone)
+        if self.colors.contains("player", (0, 0, 0)):
+            pm = cv2.bitwise_or(pm, cv2.bitwise_not(zone))
 
         # Чистим от шумов
         # kernel = np.ones((3, 3), np.uint8)
@@ -568,15 +584,13 @@ class FaSensor(Sensor):
         self.steps = 3
         self.fa = True
 
-    def open_dirs(self, frame):
-        bgr_img = extract_game(frame)
-
+    def open_dirs(self, frame: FrameBundle):
         """
         Focused arrow sensing.
 
-        bgr_img - image with 'Focused arrow' grid applied
+        frame - frame with 'Focused arrow' grid applied
         """
-        gray = cv2.cvtColor(bgr_img, cv2.COLOR_BGR2GRAY)
+        gray = frame.gray
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
         g = clahe.apply(gray)
         # выделяем тонкие яркие линии сетки
@@ -680,6 +694,6 @@ if __name__ == "__main__":
     fa_sensor.dir_cells = FA_BHALOR
 
     while 1:
-        frame = device.get_frame2()
+        frame = FrameBundle(device.get_frame2())
         fa_sensor.open_dirs(frame)
         cv2.waitKey(10)
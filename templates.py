@@ -0,0 +1,163 @@
+import logging
+import os
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Где шаблон ожидается: (x, y, w, h) в координатах того кадра, который ему
+# передаёт вызывающий (полный кадр или его ROI), и запас в пикселях. None -
+# место запоминается по первому совпадению, отдельно для каждого размера
+# кадра и scale: поиск по ROI и по полному кадру друг другу окно не сужают.
+# find_tpl сначала ищет в окне и только без попадания - по всему кадру.
+SEARCH_WINDOWS: dict[str, tuple[tuple[int, int, int, int] | None, int]] = {
+    "monetia": (None, 24),
+    "pub3": (None, 24),
+    "loader_1": (None, 8),  # внутри ROIS["loader"]
+    "loader_2": (None, 8),
+    "loader_3": (None, 8),
+    "net_error": (None, 16),  # внутри extract_game
+    "check_grade": (None, 16),
+    # вокруг точек, куда Krokust._find_combat_pos бьёт, не найдя шаблон
+    "krokust/sw_combat_pos": ((811, 410, 59, 41), 48),
+    "krokust/ne_combat_pos": ((724, 498, 52, 25), 48),
+}
+
+
+def preprocess(img_bgr):
+    # Упор на форму светлой ленты: серый + лёгкое сглаживание + контраст
+    if img_bgr.ndim == 2:
+        return img_bgr  # уже серый (например, FrameBundle.gray)
+    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+    # cv2.imshow("g", gray)
+    # cv2.waitKey(0)
+    return gray
+
+
+class Template:
+    """
+    Шаблон из resources/: исходный BGR, его preprocess() и уменьшенные копии
+    под масштабы find_tpl, посчитанные один раз.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        bgr: np.ndarray,
+        window: tuple[int, int, int, int] | None = None,
+        margin: int | None = None,
+    ) -> None:
+        self.key = key
+        self.bgr = bgr
+        self.gray = preprocess(bgr)
+        self._resized: dict[tuple[float, int], np.ndarray] = {}
+        self.window = window
+        self.margin = margin  # None - окна нет, ищем всегда по всему кадру
+        # место прошлого совпадения по (размер кадра, scale), см. remember_hit
+        self.last_hits: dict[tuple, tuple[int, int, int, int]] = {}
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return self.bgr.shape
+
+    def resized(self, s: float = 1.0, scale: int = 1) -> np.ndarray:
+        """Серый шаблон размера, который find_tpl ищет на кадре 1/scale."""
+        key = (s, scale)
+        tpl = self._resized.get(key)
+        if tpl is None:
+            w = max(1, int(self.gray.shape[1] * s / scale))
+            h = max(1, int(self.gray.shape[0] * s / scale))
+            if (w, h) == (self.gray.shape[1], self.gray.shape[0]):
+                tpl = self.gray
+            else:
+                tpl = cv2.resize(self.gray, (w, h), interpolation=cv2.INTER_AREA)
+            self._resized[key] = tpl
+        return tpl
+
+    def search_window(self, shape, scale: int = 1):
+        """
+        (x0, y0, x1, y1) на кадре shape, уменьшенном в scale раз: заданное
+        окно или место прошлого совпадения на кадре того же размера плюс
+        margin. None - искать везде.
+        """
+        rect = self.window or self.last_hits.get((shape[:2], scale))
+        if self.margin is None or rect is None:
+            return None
+        x, y, w, h = rect
+        m = self.margin
+        H, W = shape[:2]
+        x0, y0 = max(0, (x - m) // scale), max(0, (y - m) // scale)
+        x1, y1 = min(W, -(-(x + w + m) // scale)), min(H, -(-(y + h + m) // scale))
+        if x0 >= x1 or y0 >= y1 or (x1 - x0) * (y1 - y0) >= W * H:
+            return None
+        return x0, y0, x1, y1
+
+    def remember_hit(self, shape, scale: int, rect: tuple[int, int, int, int]):
+        """Запомнить совпадение rect (координаты полного кадра) на кадре shape."""
+        if self.margin is not None:
+            self.last_hits[(shape[:2], scale)] = rect
+
+
+class TemplateRegistry:
+    """
+    Все картинки resources/ в памяти: читаются с диска один раз, дальше
+    find_tpl/wait_for берут готовый серый шаблон по ключу.
+
+        TEMPLATES["monetia"]  # resources/monetia.png
+        TEMPLATES["krokust/sw"]  # resources/krokust/sw.png
+        TEMPLATES["resources/pub3.png"]  # путь тоже годится
+    """
+
+    def __init__(self, root: str = "resources", scales=(1, 2)) -> None:
+        self.root = root
+        self.scales = scales  # масштабы кадра, под которые шаблоны готовятся сразу
+        self._templates: dict[str, Template] = {}
+        self._loaded = False
+
+    def load(self) -> "TemplateRegistry":
+        if self._loaded:
+            return self
+        for folder, _, files in os.walk(self.root):
+            for name in sorted(files):
+                if name.lower().endswith(".png"):
+                    path = os.path.join(folder, name)
+                    self._add(path, self.key_of(os.path.relpath(path, self.root)))
+        self._loaded = True
+        logger.debug(f"{len(self._templates)} templates loaded from {self.root}")
+        return self
+
+    def key_of(self, name: str) -> str:
+        key = name.replace("\\", "/")
+        root = self.root.replace("\\", "/").rstrip("/") + "/"
+        if key.startswith(root):
+            key = key[len(root) :]
+        return key[:-4] if key.lower().endswith(".png") else key
+
+    def _add(self, path: str, key: str) -> Template:
+        bgr = cv2.imread(path, cv2.IMREAD_COLOR)
+        if bgr is None:
+            raise KeyError(f"template {path} not found")
+        tpl = Template(key, bgr, *SEARCH_WINDOWS.get(key, (None, None)))
+        for scale in self.scales:
+            tpl.resized(1.0, scale)
+        self._templates[key] = tpl
+        return tpl
+
+    def __getitem__(self, name: str) -> Template:
+        self.load()
+        tpl = self._templates.get(self.key_of(name))
+        if tpl is None:
+            # картинка не из resources/ - тоже читается один раз
+            tpl = self._templates.get(name) or self._add(name, name)
+        return tpl
+
+    def __contains__(self, name: str) -> bool:
+        self.load()
+        return self.key_of(name) in self._templates
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+
+TEMPLATES = TemplateRegistry()
@@ -0,0 +1,86 @@
+import logging
+import time
+from typing import Callable
+
+import cv2
+
+from frames import FrameGate
+
+logger = logging.getLogger(__name__)
+
+
+class WaitCondition:
+    """
+    Одно условие ожидания: score(frame) -> число, выполнено при
+    score >= threshold. floor - типичный score, когда цели на экране нет:
+    между floor и threshold ожидание ускоряет опрос.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        score: Callable[[cv2.typing.MatLike], float],
+        threshold: float,
+        floor: float | None = None,
+    ) -> None:
+        self.name = name
+        self.score = score
+        self.threshold = threshold
+        self.floor = threshold / 2 if floor is None else floor
+
+    def closeness(self, score: float) -> float:
+        """0 - цели нет, 1 - вот-вот совпадёт."""
+        span = self.threshold - self.floor
+        if span <= 0:
+            return 0.0
+        return min(1.0, max(0.0, (score - self.floor) / span))
+
+
+def wait_any(
+    get_frame,
+    conditions: list[WaitCondition],
+    timeout_s: float = 8,
+    get_seq: Callable[[], int] | None = None,
+    min_interval: float = 0.02,
+    max_interval: float = 0.1,
+    debug: bool = False,
+) -> tuple[str | None, float]:
+    """
+    Ждать, пока на новом кадре не выполнится любое из условий; вернуть
+    (имя условия, время ожидания) или (None, timeout_s).
+
+    Кадр проверяется, только если он новый: по get_seq() (номер кадра
+    источника, без хеширования) или по содержимому. Пауза между проверками
+    сжимается от max_interval до min_interval, когда score подбирается к
+    порогу, - переход экрана ловится быстрее, а пустой экран не грузит CPU.
+
+        name, t = wait_any(get_frame, [loader, net_error, fight_end], 30)
+    """
+    gate = FrameGate()
+    interval = max_interval
+    t0 = time.time()
+    while time.time() - t0 < timeout_s:
+        t_check = time.time()
+        frame = get_frame()
+        seq = get_seq() if get_seq is not None else None
+        if frame is None or not gate.is_new(frame, seq):
+            # кадр тот же: источник ещё не отрисовал новый, ждём тот же
+            # интервал, что и после последней проверки
+            time.sleep(interval)
+            continue
+
+        closeness = 0.0
+        for cond in conditions:
+            score = cond.score(frame)
+            if score >= cond.threshold:
+                waited = time.time() - t0
+                if debug:
+                    print(f"{cond.name} detected t={waited:.1f}s score={score:.2f}")
+                return cond.name, waited
+            closeness = max(closeness, cond.closeness(score))
+
+        interval = max_interval - (max_interval - min_interval) * closeness
+        delay = interval - (time.time() - t_check)
+        if delay > 0:
+            time.sleep(delay)
+    return None, timeout_s